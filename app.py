@@ -4,57 +4,101 @@ Main Application Module
 This module serves as the entry point for the AI voice assistant application.
 """
 import os
+import queue
 import sys
 import logging
-import logging.config
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 import config
-from voice_assistant.assistant_manager import AssistantManager
-from ui.main_window import MainWindow
 
-def setup_logging():
-    """Set up logging configuration."""
-    logging_config = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'standard': {
-                'format': '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
-            },
-        },
-        'handlers': {
-            'console': {
-                'class': 'logging.StreamHandler',
-                'level': config.LOG_LEVEL,
-                'formatter': 'standard',
-                'stream': 'ext://sys.stdout',
-            },
-            'file': {
-                'class': 'logging.FileHandler',
-                'level': config.LOG_LEVEL,
-                'formatter': 'standard',
-                'filename': config.LOG_FILE,
-                'mode': 'a',
-            },
-        },
-        'root': {
-            'level': config.LOG_LEVEL,
-            'handlers': ['console', 'file'],
-        },
-    }
+class BufferedFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler that leaves flushing to the stream buffer.
+    
+    The standard handler flushes after every record and seeks to the end of
+    the file to decide on rollover; this one writes through a larger buffer
+    that is flushed when full and when the handler is closed, and tracks the
+    file size itself (counting characters as an approximation of bytes).
+    """
+    
+    def __init__(self, filename: str, mode: str = 'a', maxBytes: int = 0, backupCount: int = 0,
+                 buffer_size: int = 64 * 1024, delay: bool = False):
+        self.buffer_size = buffer_size
+        self._size = 0
+        self._record_size = 0
+        super().__init__(filename, mode=mode, maxBytes=maxBytes, backupCount=backupCount, delay=delay)
+    
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=self.buffer_size, encoding=self.encoding)
+        self._size = os.path.getsize(self.baseFilename)
+        return stream
+    
+    def shouldRollover(self, record) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0:
+            return False
+        self._record_size = len(self.format(record)) + len(self.terminator)
+        return self._size + self._record_size >= self.maxBytes
+    
+    def emit(self, record):
+        super().emit(record)
+        self._size += self._record_size
+    
+    def flush(self):
+        """Do nothing; the stream is flushed by its buffer and on close."""
+
+_log_listener = None
+
+def setup_logging() -> QueueListener:
+    """
+    Set up logging configuration.
+    
+    Log records are put on a queue and written to the console and log file by
+    a background listener, so logging never blocks the calling thread on I/O.
+    
+    Calling it again returns the existing listener instead of adding handlers.
+    
+    Returns:
+        The queue listener, which must be started by the caller.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return _log_listener
     
     # Create log directory if it doesn't exist
-    log_dir = os.path.dirname(config.LOG_FILE)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    config.ensure_dir(Path(config.LOG_FILE).resolve().parent)
+    
+    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(config.LOG_LEVEL)
+    console_handler.setFormatter(formatter)
     
-    logging.config.dictConfig(logging_config)
+    file_handler = BufferedFileHandler(
+        config.LOG_FILE,
+        mode='a',
+        maxBytes=config.LOG_MAX_BYTES,
+        backupCount=config.LOG_BACKUP_COUNT,
+        delay=True
+    )
+    file_handler.setLevel(config.LOG_LEVEL)
+    file_handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(config.LOG_LEVEL)
+    root_logger.addHandler(QueueHandler(log_queue))
+    
+    _log_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    return _log_listener
 
 def main():
     """Main application entry point."""
     # Set up logging
-    setup_logging()
+    log_listener = setup_logging()
+    log_listener.start()
     logger = logging.getLogger(__name__)
     
     logger.info("Starting AI Voice Assistant")
@@ -62,6 +106,10 @@ def main():
     logger.info(f"Default user: {config.DEFAULT_USER_NAME} ({config.DEFAULT_USER_TYPE})")
     
     try:
+        # Import the heavy UI and voice modules only when the app actually runs
+        from voice_assistant.assistant_manager import AssistantManager
+        from ui.main_window import MainWindow
+        
         # Create the assistant manager
         assistant_manager = AssistantManager()
         
@@ -69,11 +117,17 @@ def main():
         app = MainWindow(assistant_manager)
         app.run()
         
+        # Release API connections and stop the background event loop
+        assistant_manager.shutdown()
+        
         logger.info("Application closed")
         return 0
     except Exception as e:
         logger.exception(f"Error in main application: {e}")
         return 1
+    finally:
+        # Drain queued records; the file handler is flushed when logging shuts down at exit
+        log_listener.stop()
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
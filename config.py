@@ -2,52 +2,265 @@
 Configuration Module
 
 This module contains configuration settings for the AI voice assistant.
+
+Environment variables are read once at import time into a frozen ``CFG``
+object. The module-level constants (``RAG_API_ENDPOINT`` etc.) are aliases
+of its fields; call ``reload()`` to re-read the environment.
+
+The parsed ``.env`` file is cached in ``env_baked.py`` (see
+tools/compile_env.py) so later starts import plain constants from bytecode
+instead of re-parsing it. The cache is rebuilt whenever ``.env`` changes.
 """
 import os
+from dataclasses import dataclass, fields
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from typing import Tuple
 
 # Base paths
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 LOGS_DIR = BASE_DIR / "logs"
+ENV_FILE = BASE_DIR / ".env"
+ENV_CACHE_FILE = BASE_DIR / "env_baked.py"
 
-# RAG API configuration
-RAG_API_ENDPOINT = os.getenv("RAG_API_ENDPOINT", "https://primary-production-5212.up.railway.app/webhook/api/v1/chat/message")
-RAG_API_KEY = os.getenv("RAG_API_KEY", "")
-RAG_API_TIMEOUT = int(os.getenv("RAG_API_TIMEOUT", "30"))
 
-# User configuration
-DEFAULT_USER_NAME = os.getenv("DEFAULT_USER_NAME", "User")
-DEFAULT_USER_TYPE = os.getenv("DEFAULT_USER_TYPE", "student")
+def write_env_cache() -> Path:
+    """
+    Parse ``.env`` and write its values to ``env_baked.py``.
+    
+    Returns:
+        The path of the generated module.
+    """
+    from dotenv import dotenv_values
+    
+    source_mtime_ns = ENV_FILE.stat().st_mtime_ns
+    values = {key: value for key, value in dotenv_values(ENV_FILE).items() if value is not None}
+    
+    lines = [
+        '"""Generated from .env by tools/compile_env.py. Do not edit."""',
+        f"SOURCE_MTIME_NS = {source_mtime_ns!r}",
+        "ENV = {",
+    ]
+    lines.extend(f"    {key!r}: {value!r}," for key, value in sorted(values.items()))
+    lines.append("}")
+    
+    # Write atomically so a concurrent import never sees a partial file
+    tmp_file = ENV_CACHE_FILE.with_suffix(".tmp")
+    tmp_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp_file, ENV_CACHE_FILE)
+    return ENV_CACHE_FILE
 
-# Speech recognition configuration
-SPEECH_RECOGNITION_LANGUAGE = os.getenv("SPEECH_RECOGNITION_LANGUAGE", "en-US")
-SPEECH_RECOGNITION_TIMEOUT = int(os.getenv("SPEECH_RECOGNITION_TIMEOUT", "5"))
-SPEECH_RECOGNITION_PHRASE_TIME_LIMIT = int(os.getenv("SPEECH_RECOGNITION_PHRASE_TIME_LIMIT", "10"))
 
-# Text-to-speech configuration
-TTS_ENGINE = os.getenv("TTS_ENGINE", "pyttsx3")  # Options: pyttsx3, gtts
-TTS_LANGUAGE = os.getenv("TTS_LANGUAGE", "en")
-TTS_VOICE_ID = os.getenv("TTS_VOICE_ID", "")  # Engine-specific voice ID
+def _load_env_file():
+    """Load ``.env`` into the environment, preferring the baked cache."""
+    try:
+        source_mtime_ns = ENV_FILE.stat().st_mtime_ns
+    except OSError:
+        source_mtime_ns = None
+    
+    try:
+        import env_baked
+    except ImportError:
+        env_baked = None
+    
+    if env_baked is not None and source_mtime_ns is not None and env_baked.SOURCE_MTIME_NS == source_mtime_ns:
+        # Like load_dotenv, don't override variables that are already set
+        for key, value in env_baked.ENV.items():
+            os.environ.setdefault(key, value)
+        return
+    
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Refresh a missing or stale cache for the next start
+    if source_mtime_ns is not None:
+        try:
+            write_env_cache()
+        except OSError:
+            pass
 
-# UI configuration
-UI_THEME = os.getenv("UI_THEME", "clam")  # Options for tkinter: clam, alt, default, classic
-UI_WINDOW_WIDTH = int(os.getenv("UI_WINDOW_WIDTH", "800"))
-UI_WINDOW_HEIGHT = int(os.getenv("UI_WINDOW_HEIGHT", "600"))
-UI_HOTKEY = os.getenv("UI_HOTKEY", "<space>")
 
-# Logging configuration
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FILE = os.getenv("LOG_FILE", str(LOGS_DIR / "assistant.log"))
+# Load environment variables from .env file
+_load_env_file()
 
 # Application paths
 RECORDINGS_DIR = DATA_DIR / "recordings"
 CACHE_DIR = DATA_DIR / "cache"
 
-# Create necessary directories
-for directory in [DATA_DIR, LOGS_DIR, RECORDINGS_DIR, CACHE_DIR]:
-    directory.mkdir(exist_ok=True, parents=True)
\ No newline at end of file
+# Fixed phrases the assistant says often
+DEFAULT_TTS_WARM_PHRASES = "|".join([
+    "I didn't catch that. Could you please repeat?",
+    "I'm sorry, I encountered an error while processing your request.",
+    "I haven't said anything yet.",
+    "I'll repeat my last response.",
+    "Goodbye! Have a great day.",
+])
+
+
+@dataclass(frozen=True)
+class _Cfg:
+    """Snapshot of the environment-driven settings."""
+    # RAG API configuration
+    rag_api_endpoint: str
+    rag_api_key: str
+    rag_api_timeout: int
+    rag_cache_size: int
+    rag_cache_ttl: int
+
+    # User configuration
+    default_user_name: str
+    default_user_type: str
+    
+    # Response cache configuration
+    response_cache_max_entries: int
+    response_cache_ttl: int
+    history_maxlen: int
+
+    # Speech recognition configuration
+    speech_recognition_language: str
+    speech_recognition_timeout: int
+    speech_recognition_phrase_time_limit: int
+    use_local_stt: bool
+    vosk_model_path: str
+
+    # Text-to-speech configuration
+    tts_engine: str
+    tts_language: str
+    tts_voice_id: str
+    tts_thinking_filler: str
+    tts_cache_enabled: bool
+    tts_cache_max_bytes: int
+    tts_warm_phrases: Tuple[str, ...]
+    tts_playback_latency_ms: int
+    barge_in: bool
+
+    # UI configuration
+    ui_theme: str
+    ui_window_width: int
+    ui_window_height: int
+    ui_hotkey: str
+    ui_max_conversation_lines: int
+
+    # Logging configuration
+    log_level: str
+    log_file: str
+    log_max_bytes: int
+    log_backup_count: int
+
+
+def _load() -> _Cfg:
+    """Read the settings from the environment."""
+    return _Cfg(
+        rag_api_endpoint=os.getenv("RAG_API_ENDPOINT", "https://primary-production-5212.up.railway.app/webhook/api/v1/chat/message"),
+        rag_api_key=os.getenv("RAG_API_KEY", ""),
+        rag_api_timeout=int(os.getenv("RAG_API_TIMEOUT", "30")),
+        rag_cache_size=int(os.getenv("RAG_CACHE_SIZE", "256")),  # 0 disables the response cache
+        rag_cache_ttl=int(os.getenv("RAG_CACHE_TTL", "300")),  # Seconds
+        default_user_name=os.getenv("DEFAULT_USER_NAME", "User"),
+        default_user_type=os.getenv("DEFAULT_USER_TYPE", "student"),
+        response_cache_max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")),
+        response_cache_ttl=int(os.getenv("RESPONSE_CACHE_TTL", "600")),  # Seconds
+        history_maxlen=int(os.getenv("HISTORY_MAXLEN", "200")),  # Conversation turns kept in memory
+        speech_recognition_language=os.getenv("SPEECH_RECOGNITION_LANGUAGE", "en-US"),
+        speech_recognition_timeout=int(os.getenv("SPEECH_RECOGNITION_TIMEOUT", "5")),
+        speech_recognition_phrase_time_limit=int(os.getenv("SPEECH_RECOGNITION_PHRASE_TIME_LIMIT", "10")),
+        use_local_stt=os.getenv("USE_LOCAL_STT", "false").lower() in ("1", "true", "yes"),  # Vosk instead of Google
+        vosk_model_path=os.getenv("VOSK_MODEL_PATH", str(DATA_DIR / "vosk-model")),
+        tts_engine=os.getenv("TTS_ENGINE", "pyttsx3"),  # Options: pyttsx3, gtts
+        tts_language=os.getenv("TTS_LANGUAGE", "en"),
+        tts_voice_id=os.getenv("TTS_VOICE_ID", ""),  # Engine-specific voice ID
+        tts_thinking_filler=os.getenv("TTS_THINKING_FILLER", ""),  # Spoken while a slow query runs; empty disables
+        tts_cache_enabled=os.getenv("TTS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),  # gTTS audio kept on disk
+        tts_cache_max_bytes=int(os.getenv("TTS_CACHE_MAX_BYTES", str(100 * 1024 * 1024))),
+        tts_warm_phrases=tuple(  # Pre-synthesized at startup; separated by |
+            phrase.strip() for phrase in os.getenv("TTS_WARM_PHRASES", DEFAULT_TTS_WARM_PHRASES).split("|")
+            if phrase.strip()
+        ),
+        tts_playback_latency_ms=int(os.getenv("TTS_PLAYBACK_LATENCY_MS", "0")),  # gTTS output buffer; 0 uses the device's low-latency default
+        barge_in=os.getenv("BARGE_IN", "false").lower() in ("1", "true", "yes"),  # Interrupt speech when the user talks
+        ui_theme=os.getenv("UI_THEME", "clam"),  # Options for tkinter: clam, alt, default, classic
+        ui_window_width=int(os.getenv("UI_WINDOW_WIDTH", "800")),
+        ui_window_height=int(os.getenv("UI_WINDOW_HEIGHT", "600")),
+        ui_hotkey=os.getenv("UI_HOTKEY", "<space>"),
+        ui_max_conversation_lines=int(os.getenv("UI_MAX_CONVERSATION_LINES", "500")),
+        log_level=os.getenv("LOG_LEVEL", "INFO"),
+        log_file=os.getenv("LOG_FILE", str(LOGS_DIR / "assistant.log")),
+        log_max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+        log_backup_count=int(os.getenv("LOG_BACKUP_COUNT", "3")),
+    )
+
+
+CFG = _load()
+
+# Module-level aliases (each is the upper-cased name of a CFG field)
+RAG_API_ENDPOINT = CFG.rag_api_endpoint
+RAG_API_KEY = CFG.rag_api_key
+RAG_API_TIMEOUT = CFG.rag_api_timeout
+RAG_CACHE_SIZE = CFG.rag_cache_size
+RAG_CACHE_TTL = CFG.rag_cache_ttl
+
+DEFAULT_USER_NAME = CFG.default_user_name
+DEFAULT_USER_TYPE = CFG.default_user_type
+
+RESPONSE_CACHE_MAX_ENTRIES = CFG.response_cache_max_entries
+RESPONSE_CACHE_TTL = CFG.response_cache_ttl
+HISTORY_MAXLEN = CFG.history_maxlen
+
+SPEECH_RECOGNITION_LANGUAGE = CFG.speech_recognition_language
+SPEECH_RECOGNITION_TIMEOUT = CFG.speech_recognition_timeout
+SPEECH_RECOGNITION_PHRASE_TIME_LIMIT = CFG.speech_recognition_phrase_time_limit
+USE_LOCAL_STT = CFG.use_local_stt
+VOSK_MODEL_PATH = CFG.vosk_model_path
+
+TTS_ENGINE = CFG.tts_engine
+TTS_LANGUAGE = CFG.tts_language
+TTS_VOICE_ID = CFG.tts_voice_id
+TTS_THINKING_FILLER = CFG.tts_thinking_filler
+TTS_CACHE_ENABLED = CFG.tts_cache_enabled
+TTS_CACHE_MAX_BYTES = CFG.tts_cache_max_bytes
+TTS_WARM_PHRASES = CFG.tts_warm_phrases
+TTS_PLAYBACK_LATENCY_MS = CFG.tts_playback_latency_ms
+BARGE_IN = CFG.barge_in
+
+UI_THEME = CFG.ui_theme
+UI_WINDOW_WIDTH = CFG.ui_window_width
+UI_WINDOW_HEIGHT = CFG.ui_window_height
+UI_HOTKEY = CFG.ui_hotkey
+UI_MAX_CONVERSATION_LINES = CFG.ui_max_conversation_lines
+
+LOG_LEVEL = CFG.log_level
+LOG_FILE = CFG.log_file
+LOG_MAX_BYTES = CFG.log_max_bytes
+LOG_BACKUP_COUNT = CFG.log_backup_count
+
+
+def reload() -> _Cfg:
+    """
+    Re-read the environment and rebind ``CFG`` and the module-level aliases.
+    
+    Objects that captured settings at construction time keep their old values.
+    
+    Returns:
+        The new configuration snapshot.
+    """
+    global CFG
+    CFG = _load()
+    globals().update({f.name.upper(): getattr(CFG, f.name) for f in fields(CFG)})
+    return CFG
+
+
+def ensure_dir(path: Path) -> Path:
+    """
+    Create a directory (and its parents) if it doesn't exist yet.
+    
+    Directories are created by the code that uses them rather than at import.
+    
+    Args:
+        path: The directory path.
+    
+    Returns:
+        The same path, for chaining.
+    """
+    if not path.is_dir():
+        path.mkdir(exist_ok=True, parents=True)
+    return path
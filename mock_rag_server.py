@@ -4,24 +4,57 @@ Mock RAG Server
 This script provides a simple mock server for the RAG API to facilitate testing.
 It simulates the behavior of the actual RAG API by responding to queries with
 predefined answers or generating responses based on the query content.
+
+Running this script starts Flask's built-in server. For concurrent load, serve
+``wsgi:app`` with a production WSGI server instead (see wsgi.py).
 """
+import atexit
+import functools
 import json
 import logging
+import queue
 import random
+import re
+import string
 import time
-from typing import Dict, Any, List, Optional
+from collections import Counter, defaultdict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple
 
+import orjson
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+try:
+    import hyperscan
+except ImportError:  # Optional: falls back to tokenizing the query with TOKEN_PATTERN
+    hyperscan = None
+
+# Configure logging: request threads only enqueue records, and a background
+# listener writes them out so workers don't contend on the stream lock
+log_queue = queue.SimpleQueue()
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, stream_handler)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """
+    JSON provider backed by orjson, used by ``jsonify`` and ``request.json``.
+    """
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 # Create Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Sample knowledge base for the mock RAG server
 KNOWLEDGE_BASE = {
@@ -48,12 +81,92 @@ KNOWLEDGE_BASE = {
 }
 
 # Generic responses for queries not in the knowledge base
-GENERIC_RESPONSES = [
+GENERIC_RESPONSES = (
     "I don't have specific information about that, but I can help you find resources on the topic.",
     "That's an interesting question. While I don't have a definitive answer, I can suggest some related concepts to explore.",
     "I'm not sure about that specific query. Could you provide more details or rephrase your question?",
     "I don't have enough information to answer that question accurately. Would you like me to help you research this topic?"
-]
+)
+
+# Module-level random generator for simulated delays and generic responses
+rng = random.Random()
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Translation table that strips punctuation during normalization
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into casefolded word tokens.
+    
+    Args:
+        text: The text to tokenize
+    
+    Returns:
+        A list of tokens
+    """
+    return TOKEN_PATTERN.findall(text.casefold())
+
+# Knowledge base keys by their casefolded form, for exact matches
+KB_NORMALIZED = {kb_query.casefold(): kb_query for kb_query in KNOWLEDGE_BASE}
+
+# Inverted index mapping each token to the knowledge base keys containing it
+KB_INDEX: Dict[str, List[str]] = defaultdict(list)
+for kb_query in KNOWLEDGE_BASE:
+    for token in set(tokenize(kb_query)):
+        KB_INDEX[token].append(kb_query)
+
+# With hyperscan available, all indexed tokens are compiled into a single
+# database so a query is scanned once for every token it contains
+KB_TOKENS = list(KB_INDEX)
+KB_MATCHER = None
+if hyperscan is not None:
+    KB_MATCHER = hyperscan.Database()
+    KB_MATCHER.compile(
+        expressions=[rf"\b{re.escape(token)}\b".encode() for token in KB_TOKENS],
+        ids=list(range(len(KB_TOKENS))),
+        elements=len(KB_TOKENS),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH |
+               hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP] * len(KB_TOKENS)
+    )
+
+def find_kb_tokens(normalized_query: str) -> Set[str]:
+    """
+    Find the tokens of a normalized query that may appear in the knowledge base.
+    
+    Args:
+        normalized_query: The casefolded query text
+    
+    Returns:
+        A set of tokens to look up in KB_INDEX
+    """
+    if KB_MATCHER is None:
+        return set(tokenize(normalized_query))
+    
+    matched = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        matched.add(KB_TOKENS[pattern_id])
+    
+    KB_MATCHER.scan(normalized_query.encode(), match_event_handler=on_match)
+    return matched
+
+@functools.lru_cache(maxsize=1024)
+def normalize_query(query: str) -> Tuple[str, FrozenSet[str]]:
+    """
+    Normalize a raw query and find its knowledge base tokens.
+    
+    Results are cached, so repeated queries skip normalization and matching.
+    
+    Args:
+        query: The raw query text
+    
+    Returns:
+        A tuple of (normalized query, tokens to look up in KB_INDEX)
+    """
+    normalized_query = query.casefold().translate(PUNCTUATION_TABLE).strip()
+    return normalized_query, frozenset(find_kb_tokens(normalized_query))
 
 @app.route('/api/rag', methods=['POST'])
 def rag_endpoint():
@@ -96,14 +209,15 @@ def rag_endpoint():
         # Log the incoming query
         logger.info(f"Received query from {user_name} ({user_type}): {query}")
         
-        # Simulate processing delay
-        time.sleep(random.uniform(0.5, 2.0))
+        # Simulate processing delay (yields to other requests under gevent workers)
+        time.sleep(rng.uniform(0.5, 2.0))
         
         # Process the query
         response_data = process_query(query, user_name, user_type)
         
-        # Log the response
-        logger.info(f"Sending response: {response_data['response'][:50]}...")
+        # Log the response (skip the slicing when INFO is disabled)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Sending response: %s...", response_data['response'][:50])
         
         return jsonify(response_data), 200
     
@@ -127,11 +241,11 @@ def process_query(query: str, user_name: str, user_type: str) -> Dict[str, Any]:
         A dictionary containing the response data
     """
     # Normalize query for matching
-    normalized_query = query.lower().strip()
+    normalized_query, query_tokens = normalize_query(query)
     
     # Check for direct matches in knowledge base
-    if normalized_query in KNOWLEDGE_BASE:
-        kb_entry = KNOWLEDGE_BASE[normalized_query]
+    if normalized_query in KB_NORMALIZED:
+        kb_entry = KNOWLEDGE_BASE[KB_NORMALIZED[normalized_query]]
         return {
             "response": kb_entry["answer"],
             "confidence": kb_entry["confidence"],
@@ -141,22 +255,25 @@ def process_query(query: str, user_name: str, user_type: str) -> Dict[str, Any]:
             "user_type": user_type
         }
     
-    # Check for partial matches
-    for kb_query, kb_entry in KNOWLEDGE_BASE.items():
-        # Simple partial matching logic
-        if any(word in normalized_query for word in kb_query.split()):
-            return {
-                "response": kb_entry["answer"],
-                "confidence": kb_entry["confidence"] * 0.8,  # Lower confidence for partial matches
-                "sources": kb_entry["sources"],
-                "timestamp": time.time(),
-                "user_name": user_name,
-                "user_type": user_type
-            }
+    # Check for partial matches, scoring candidates by shared tokens
+    scores = Counter()
+    for token in query_tokens:
+        scores.update(KB_INDEX.get(token, ()))
+    
+    if scores:
+        kb_entry = KNOWLEDGE_BASE[max(scores, key=scores.get)]
+        return {
+            "response": kb_entry["answer"],
+            "confidence": kb_entry["confidence"] * 0.8,  # Lower confidence for partial matches
+            "sources": kb_entry["sources"],
+            "timestamp": time.time(),
+            "user_name": user_name,
+            "user_type": user_type
+        }
     
     # If no match found, return a generic response
     return {
-        "response": random.choice(GENERIC_RESPONSES),
+        "response": rng.choice(GENERIC_RESPONSES),
         "confidence": 0.5,
         "sources": ["General Knowledge"],
         "timestamp": time.time(),
@@ -166,4 +283,4 @@ def process_query(query: str, user_name: str, user_type: str) -> Dict[str, Any]:
 
 if __name__ == '__main__':
     logger.info("Starting mock RAG server on http://localhost:5000")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
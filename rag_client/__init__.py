@@ -2,8 +2,23 @@
 RAG Client Package
 
 This package contains the client for interacting with the RAG API.
+
+The clients are imported on first access so that importing the package does
+not pull in their HTTP libraries until they are needed.
 """
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'RAGAPIClient': 'rag_client.api_client',
+    'AsyncRAGAPIClient': 'rag_client.async_client',
+    'RAGResult': 'rag_client.models',
+}
 
-from rag_client.api_client import RAGAPIClient
+__all__ = ['RAGAPIClient', 'AsyncRAGAPIClient', 'RAGResult']
 
-__all__ = ['RAGAPIClient']
\ No newline at end of file
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
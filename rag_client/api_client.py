@@ -4,19 +4,27 @@ RAG API Client Module
 This module provides a client for interacting with the RAG API.
 """
 import logging
-import json
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from typing import Optional
 
+import orjson
 import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import config
+from rag_client.models import RAGResult
 
 logger = logging.getLogger(__name__)
 
 class RAGAPIClient:
     """
     Client for interacting with the RAG API.
+    
+    One pooled session is kept for the lifetime of the client, so queries
+    reuse open connections; call close() when done.
     """
     
     def __init__(self, 
@@ -31,9 +39,38 @@ class RAGAPIClient:
             api_key: The API key. If None, uses the value from config.
             timeout: The request timeout in seconds. If None, uses the value from config.
         """
-        self.endpoint = endpoint or config.RAG_API_ENDPOINT
-        self.api_key = api_key or config.RAG_API_KEY
-        self.timeout = timeout or config.RAG_API_TIMEOUT
+        cfg = config.CFG
+        self.endpoint = endpoint or cfg.rag_api_endpoint
+        self.api_key = api_key or cfg.rag_api_key
+        self.timeout = timeout or cfg.rag_api_timeout
+        self._default_user_name = cfg.default_user_name
+        self._default_user_type = cfg.default_user_type
+        
+        # Recent responses keyed by (query, user name, user type, context)
+        self._cache = None
+        if cfg.rag_cache_size > 0:
+            self._cache = TTLCache(maxsize=cfg.rag_cache_size, ttl=cfg.rag_cache_ttl)
+        self._cache_lock = threading.Lock()
+        
+        # Headers are the same for every request, so build them once
+        self._headers = {
+            "Content-Type": "application/json"
+        }
+        
+        if self.api_key:
+            self._headers["Authorization"] = f"Bearer {self.api_key}"
+        
+        # Reuse connections across queries (HTTP keep-alive)
+        retries = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(["POST"])
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
         
         logger.info(f"RAG API client initialized with endpoint: {self.endpoint}")
     
@@ -41,7 +78,7 @@ class RAGAPIClient:
              query_text: str,
              context: Optional[str] = None,
              user_name: Optional[str] = None,
-             user_type: Optional[str] = None) -> Dict[str, Any]:
+             user_type: Optional[str] = None) -> RAGResult:
         """
         Send a query to the RAG API.
         
@@ -52,7 +89,7 @@ class RAGAPIClient:
             user_type: The user's type (staff/student).
         
         Returns:
-            The API response as a dictionary.
+            The parsed API response.
         
         Raises:
             Exception: If the API request fails.
@@ -60,62 +97,99 @@ class RAGAPIClient:
         if not query_text:
             raise ValueError("Query text cannot be empty")
         
+        user_name = user_name or self._default_user_name
+        user_type = user_type or self._default_user_type
+        cache_key = (query_text, user_name, user_type, context)
+        
+        if self._cache is not None:
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("RAG API cache hit: %s", query_text)
+                return cached
+        
         try:
             # Prepare the request payload
             payload = {
-                "name": user_name or config.DEFAULT_USER_NAME,
-                "user_type": user_type or config.DEFAULT_USER_TYPE,
+                "name": user_name,
+                "user_type": user_type,
                 "message": query_text
             }
             
             if context:
                 payload["context"] = context
             
-            # Prepare headers
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            if self.api_key:
-                headers["Authorization"] = f"Bearer {self.api_key}"
-            
-            logger.debug(f"Sending query to RAG API: {query_text}")
+            logger.debug("Sending query to RAG API: %s", query_text)
             start_time = time.time()
             
             # Send the request
-            response = requests.post(
+            response = self._session.post(
                 self.endpoint,
-                headers=headers,
-                data=json.dumps(payload),
+                headers=self._headers,
+                data=orjson.dumps(payload),
                 timeout=self.timeout
             )
             
             elapsed_time = time.time() - start_time
-            logger.debug(f"RAG API response received in {elapsed_time:.2f}s")
+            logger.debug("RAG API response received in %.2fs", elapsed_time)
             
             # Check for errors
             response.raise_for_status()
             
             # Parse the response
-            response_data = response.json()
+            response_data = orjson.loads(response.content)
             
-            # Format the response
-            result = {
-                'answer': response_data.get('response', ''),
-                'confidence': response_data.get('confidence', 0.0),
-                'sources': response_data.get('sources', []),
-                'timestamp': response_data.get('timestamp', time.time()),
-                'query': query_text,
-                'raw_response': response_data
-            }
+            # Extract the fields we use
+            result = RAGResult(
+                answer=response_data.get('response', ''),
+                confidence=response_data.get('confidence', 0.0),
+                sources=response_data.get('sources', []),
+                timestamp=response_data.get('timestamp', time.time()),
+                query=query_text
+            )
+            
+            if self._cache is not None:
+                with self._cache_lock:
+                    self._cache[cache_key] = result
             
             return result
         except requests.exceptions.RequestException as e:
             logger.error(f"RAG API request failed: {e}")
             raise Exception(f"Failed to connect to RAG API: {e}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse RAG API response: {e}")
             raise Exception(f"Invalid response from RAG API: {e}")
         except Exception as e:
             logger.exception(f"Unexpected error in RAG API query: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def warmup(self):
+        """
+        Open a pooled connection to the API ahead of the first query.
+        
+        Sends a HEAD request to the endpoint so DNS lookup and the TLS handshake
+        are done before the user asks anything. Any response, including an
+        error status, leaves a reusable connection in the pool.
+        """
+        try:
+            start_time = time.time()
+            self._session.head(self.endpoint, headers=self._headers, timeout=self.timeout)
+            logger.debug("RAG API connection warmed up in %.2fs", time.time() - start_time)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"RAG API warm-up failed: {e}")
+    
+    def cache_clear(self):
+        """Discard all cached responses."""
+        if self._cache is not None:
+            with self._cache_lock:
+                self._cache.clear()
+    
+    def close(self):
+        """Close the underlying HTTP session and release its connections."""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
\ No newline at end of file
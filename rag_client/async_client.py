@@ -0,0 +1,175 @@
+"""
+Async RAG API Client Module
+
+This module provides an asyncio-based client for interacting with the RAG API.
+"""
+import logging
+import time
+from typing import Optional
+
+import httpx
+import orjson
+from cachetools import TTLCache
+
+import config
+from rag_client.models import RAGResult
+
+logger = logging.getLogger(__name__)
+
+class AsyncRAGAPIClient:
+    """
+    Asynchronous client for interacting with the RAG API.
+    
+    Requests share one HTTP/2 connection, so concurrent queries are
+    multiplexed instead of each needing its own socket or thread.
+    """
+    
+    def __init__(self,
+                endpoint: Optional[str] = None,
+                api_key: Optional[str] = None,
+                timeout: Optional[int] = None):
+        """
+        Initialize the async RAG API client.
+        
+        Args:
+            endpoint: The API endpoint URL. If None, uses the value from config.
+            api_key: The API key. If None, uses the value from config.
+            timeout: The request timeout in seconds. If None, uses the value from config.
+        """
+        cfg = config.CFG
+        self.endpoint = endpoint or cfg.rag_api_endpoint
+        self.api_key = api_key or cfg.rag_api_key
+        self.timeout = timeout or cfg.rag_api_timeout
+        self._default_user_name = cfg.default_user_name
+        self._default_user_type = cfg.default_user_type
+        
+        # Recent responses keyed by (query, user name, user type, context)
+        self._cache = None
+        if cfg.rag_cache_size > 0:
+            self._cache = TTLCache(maxsize=cfg.rag_cache_size, ttl=cfg.rag_cache_ttl)
+        
+        headers = {
+            "Content-Type": "application/json"
+        }
+        
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        
+        self._client = httpx.AsyncClient(http2=True, timeout=self.timeout, headers=headers)
+        
+        logger.info(f"Async RAG API client initialized with endpoint: {self.endpoint}")
+    
+    async def query(self,
+                   query_text: str,
+                   context: Optional[str] = None,
+                   user_name: Optional[str] = None,
+                   user_type: Optional[str] = None) -> RAGResult:
+        """
+        Send a query to the RAG API.
+        
+        Args:
+            query_text: The query text.
+            context: Optional context for the query.
+            user_name: The user's name.
+            user_type: The user's type (staff/student).
+        
+        Returns:
+            The parsed API response.
+        
+        Raises:
+            Exception: If the API request fails.
+        """
+        if not query_text:
+            raise ValueError("Query text cannot be empty")
+        
+        user_name = user_name or self._default_user_name
+        user_type = user_type or self._default_user_type
+        cache_key = (query_text, user_name, user_type, context)
+        
+        if self._cache is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("RAG API cache hit: %s", query_text)
+                return cached
+        
+        try:
+            # Prepare the request payload
+            payload = {
+                "name": user_name,
+                "user_type": user_type,
+                "message": query_text
+            }
+            
+            if context:
+                payload["context"] = context
+            
+            logger.debug("Sending query to RAG API: %s", query_text)
+            start_time = time.time()
+            
+            # Send the request
+            response = await self._client.post(
+                self.endpoint,
+                content=orjson.dumps(payload)
+            )
+            
+            elapsed_time = time.time() - start_time
+            logger.debug("RAG API response received in %.2fs", elapsed_time)
+            
+            # Check for errors
+            response.raise_for_status()
+            
+            # Parse the response
+            response_data = orjson.loads(response.content)
+            
+            # Extract the fields we use
+            result = RAGResult(
+                answer=response_data.get('response', ''),
+                confidence=response_data.get('confidence', 0.0),
+                sources=response_data.get('sources', []),
+                timestamp=response_data.get('timestamp', time.time()),
+                query=query_text
+            )
+            
+            if self._cache is not None:
+                self._cache[cache_key] = result
+            
+            return result
+        except httpx.HTTPError as e:
+            logger.error(f"RAG API request failed: {e}")
+            raise Exception(f"Failed to connect to RAG API: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Failed to parse RAG API response: {e}")
+            raise Exception(f"Invalid response from RAG API: {e}")
+        except Exception as e:
+            logger.exception(f"Unexpected error in RAG API query: {e}")
+            raise
+    
+    async def warmup(self):
+        """
+        Open a connection to the API ahead of the first query.
+        
+        Sends a HEAD request to the endpoint so DNS lookup and the TLS handshake
+        are done before the user asks anything. Any response, including an
+        error status, leaves a reusable connection.
+        """
+        try:
+            start_time = time.time()
+            await self._client.head(self.endpoint)
+            logger.debug("Async RAG API connection warmed up in %.2fs", time.time() - start_time)
+        except httpx.HTTPError as e:
+            logger.warning(f"Async RAG API warm-up failed: {e}")
+    
+    def cache_clear(self):
+        """Discard all cached responses."""
+        if self._cache is not None:
+            self._cache.clear()
+    
+    async def aclose(self):
+        """Close the underlying HTTP client and release its connections."""
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
@@ -0,0 +1,20 @@
+"""
+RAG Client Models Module
+
+This module defines the data structures returned by the RAG API clients.
+"""
+from dataclasses import dataclass
+from typing import List
+
+@dataclass
+class RAGResult:
+    """
+    A parsed RAG API response.
+    """
+    __slots__ = ('answer', 'confidence', 'sources', 'timestamp', 'query')
+    
+    answer: str
+    confidence: float
+    sources: List[str]
+    timestamp: float
+    query: str
\ No newline at end of file
@@ -8,9 +8,12 @@ responses are formatted as expected.
 import json
 import logging
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
 from typing import Dict, Any
 
-from rag_client import RAGAPIClient
+from rag_client import RAGAPIClient, RAGResult
 import config
 
 # Configure logging
@@ -29,9 +32,39 @@ TEST_QUERIES = [
     "Tell me about quantum computing",
 ]
 
+def print_response(query: str, user_name: str, user_type: str, response: Any) -> None:
+    """
+    Display a RAG API response.
+    
+    Args:
+        query: The query that was sent
+        user_name: The user name the query was sent as
+        user_type: The user type the query was sent as
+        response: The response returned by the client
+    """
+    print("\n" + "="*80)
+    print(f"Query: {query}")
+    print(f"User: {user_name} ({user_type})")
+    print("-"*80)
+    
+    if isinstance(response, RAGResult):
+        # Pretty print the response
+        print(f"Answer: {response.answer or 'No answer provided'}")
+        print(f"Confidence: {response.confidence}")
+        print(f"Sources: {', '.join(response.sources or ['No sources provided'])}")
+        print(f"Timestamp: {response.timestamp}")
+        
+        # Print the full result for debugging
+        print("\nFull Result:")
+        print(json.dumps(asdict(response), indent=2))
+    else:
+        print(f"Unexpected response format: {response}")
+    
+    print("="*80)
+
 def test_rag_api(endpoint: str = None, api_key: str = None) -> None:
     """
-    Test the RAG API by sending sample queries and displaying the responses.
+    Test the RAG API by sending sample queries concurrently and displaying the responses.
     
     Args:
         endpoint: The RAG API endpoint (optional, defaults to config value)
@@ -43,52 +76,42 @@ def test_rag_api(endpoint: str = None, api_key: str = None) -> None:
     
     logger.info(f"Testing RAG API at endpoint: {endpoint}")
     
-    # Create RAG API client
-    client = RAGAPIClient(endpoint=endpoint, api_key=api_key)
-    
     # Test with different user types
     user_types = ["student", "teacher", "researcher"]
     user_names = ["Alice", "Bob", "Charlie"]
     
-    for i, query in enumerate(TEST_QUERIES):
-        # Cycle through user types and names
-        user_type = user_types[i % len(user_types)]
-        user_name = user_names[i % len(user_names)]
+    # The client's pooled session is shared by all worker threads
+    with RAGAPIClient(endpoint=endpoint, api_key=api_key) as client, \
+            ThreadPoolExecutor(max_workers=len(TEST_QUERIES)) as executor:
+        futures = {}
+        start_time = time.time()
         
-        logger.info(f"Testing query as {user_name} ({user_type}): {query}")
-        
-        try:
+        for i, query in enumerate(TEST_QUERIES):
+            # Cycle through user types and names
+            user_type = user_types[i % len(user_types)]
+            user_name = user_names[i % len(user_names)]
+            
+            logger.info(f"Testing query as {user_name} ({user_type}): {query}")
+            
             # Send query to RAG API
-            response = client.query(
+            future = executor.submit(
+                client.query,
                 query_text=query,
                 user_name=user_name,
                 user_type=user_type
             )
+            futures[future] = (query, user_name, user_type)
+        
+        for future in as_completed(futures):
+            query, user_name, user_type = futures[future]
             
-            # Display response
-            print("\n" + "="*80)
-            print(f"Query: {query}")
-            print(f"User: {user_name} ({user_type})")
-            print("-"*80)
-            
-            if isinstance(response, dict):
-                # Pretty print the response
-                print(f"Answer: {response.get('answer', 'No answer provided')}")
-                print(f"Confidence: {response.get('confidence', 'N/A')}")
-                print(f"Sources: {', '.join(response.get('sources', ['No sources provided']))}")
-                print(f"Timestamp: {response.get('timestamp', 'N/A')}")
-                
-                # Print raw response for debugging
-                print("\nRaw Response:")
-                print(json.dumps(response, indent=2))
-            else:
-                print(f"Unexpected response format: {response}")
-            
-            print("="*80)
-            
-        except Exception as e:
-            logger.error(f"Error testing query '{query}': {e}")
-            print(f"Error: {e}")
+            try:
+                print_response(query, user_name, user_type, future.result())
+            except Exception as e:
+                logger.error(f"Error testing query '{query}': {e}")
+                print(f"Error: {e}")
+        
+        logger.info(f"{len(TEST_QUERIES)} queries completed in {time.time() - start_time:.2f}s")
 
 def main() -> None:
     """
@@ -0,0 +1,42 @@
+"""
+Tests for the assistant manager's turn state handling.
+"""
+import unittest
+from unittest import mock
+
+from voice_assistant import assistant_manager
+from voice_assistant.assistant_manager import AssistantManager, AssistantState
+
+def _make_manager() -> AssistantManager:
+    """Create an assistant manager with its components mocked out."""
+    with mock.patch.object(assistant_manager, 'RAGAPIClient'), \
+            mock.patch.object(assistant_manager, 'AsyncRAGAPIClient', return_value=mock.AsyncMock()), \
+            mock.patch.object(assistant_manager, 'SpeechRecognizer'), \
+            mock.patch.object(assistant_manager, 'TextToSpeech'), \
+            mock.patch.object(assistant_manager, 'NLPProcessor'):
+        return AssistantManager()
+
+class ListenAndRespondTest(unittest.TestCase):
+    """Tests for a voice turn."""
+    
+    def setUp(self):
+        self.manager = _make_manager()
+        self.addCleanup(self.manager.shutdown)
+    
+    def test_unrecognized_speech_returns_to_idle(self):
+        """Audio that was captured but not recognized must not leave the turn in THINKING."""
+        def recognize(on_listening_start, on_listening_end, on_partial_transcript):
+            on_listening_start()
+            on_listening_end()
+            return None
+        
+        self.manager.speech_recognizer.recognize_from_microphone.side_effect = recognize
+        self.manager._transition(AssistantState.LISTENING)
+        
+        self.manager._listen_and_respond_thread()
+        
+        self.assertEqual(self.manager.state, AssistantState.IDLE)
+        self.manager.nlp_processor.process_query.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for command detection in the NLP processor.
+"""
+import unittest
+from unittest import mock
+
+from rag_client.models import RAGResult
+from voice_assistant.nlp_processor import COMMAND_FIRST_CHARS, NLPProcessor
+
+# (query, expected intent) for every literal and prefix command form
+STATIC_COMMANDS = [
+    ("help", 'help'),
+    ("What can you do", 'help'),
+    ("what commands do you know", 'help'),
+    ("exit", 'exit'),
+    ("QUIT", 'exit'),
+    ("goodbye", 'exit'),
+    ("repeat", 'repeat'),
+    ("say that again", 'repeat'),
+    ("what did you say just now", 'repeat'),
+    ("what is your name", 'get_assistant_name'),
+    ("Who are you", 'get_assistant_name'),
+]
+
+# (query, expected intent, captured group, expected value) for commands that take a value
+VALUE_COMMANDS = [
+    ("I am a staff", 'set_user_type', 'user_type', "staff"),
+    ("i am a Student", 'set_user_type', 'user_type', "Student"),
+    ("set my name to Alice", 'set_user_name', 'user_name', "Alice"),
+    ("Call my name to Bob Smith", 'set_user_name', 'user_name', "Bob Smith"),
+    ("change my name to Dr. Who", 'set_user_name', 'user_name', "Dr. Who"),
+]
+
+# Queries that are not commands, including ones starting with a command's first character
+NON_COMMANDS = [
+    "what is the capital of france",
+    "is the library open today",
+    "can you explain quantum computing",
+    "set up a meeting for tomorrow",
+    "i am a teacher",
+    "helpful tips for exams",
+    "",
+]
+
+class CommandDetectionTest(unittest.TestCase):
+    """Tests for NLPProcessor command detection and handling."""
+    
+    def setUp(self):
+        rag_client = mock.Mock()
+        rag_client.query.return_value = RAGResult(
+            answer="An answer.", confidence=1.0, sources=[], timestamp=0.0, query=""
+        )
+        self.processor = NLPProcessor(rag_client=rag_client)
+    
+    def test_static_commands(self):
+        for query, intent in STATIC_COMMANDS:
+            with self.subTest(query=query):
+                self.assertEqual(self.processor._detect_command_intent(query), (intent, None))
+                self.assertTrue(self.processor.is_command(query))
+                
+                response = self.processor.process_query(query)
+                self.assertTrue(response['is_command'])
+                self.assertEqual(response['intent'], intent)
+                self.assertEqual(response['query'], query)
+    
+    def test_value_commands(self):
+        for query, intent, group, value in VALUE_COMMANDS:
+            with self.subTest(query=query):
+                detected, match = self.processor._detect_command_intent(query)
+                self.assertEqual(detected, intent)
+                self.assertEqual(match.group(group), value)
+                self.assertTrue(self.processor.is_command(query))
+    
+    def test_set_user_type_updates_user(self):
+        response = self.processor.process_query("I am a Staff")
+        
+        self.assertEqual(self.processor.user_type, "staff")
+        self.assertTrue(response['user_type_changed'])
+        self.processor.rag_client.query.assert_not_called()
+    
+    def test_set_user_name_updates_user(self):
+        response = self.processor.process_query("set my name to  Alice ")
+        
+        self.assertEqual(self.processor.user_name, "Alice")
+        self.assertTrue(response['user_name_changed'])
+        self.processor.rag_client.query.assert_not_called()
+    
+    def test_non_commands(self):
+        for query in NON_COMMANDS:
+            with self.subTest(query=query):
+                self.assertEqual(self.processor._detect_command_intent(query), (None, None))
+                self.assertFalse(self.processor.is_command(query))
+    
+    def test_non_command_with_command_first_char_goes_to_rag(self):
+        query = "can you explain quantum computing"
+        self.assertIn(query[0], COMMAND_FIRST_CHARS)
+        
+        response = self.processor.process_query(query)
+        
+        self.assertFalse(response['is_command'])
+        self.assertEqual(response['response'], "An answer.")
+        self.processor.rag_client.query.assert_called_once_with(
+            query_text=query,
+            user_name=self.processor.user_name,
+            user_type=self.processor.user_type
+        )
+    
+    def test_first_chars_cover_all_value_commands(self):
+        for query, _, _, _ in VALUE_COMMANDS:
+            with self.subTest(query=query):
+                self.assertIn(query[0].lower(), COMMAND_FIRST_CHARS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Tests for the RAG response cache.
+"""
+import unittest
+from unittest import mock
+
+from voice_assistant.rag_cache import SmartRAGCache
+
+def _response(text: str) -> dict:
+    """Build a cached response with the given answer text."""
+    return {'response': text, 'success': True}
+
+class SmartRAGCacheTest(unittest.TestCase):
+    """Tests for SmartRAGCache."""
+    
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('voice_assistant.rag_cache.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _put(self, cache: SmartRAGCache, query: str, text: str = "answer",
+             user_name: str = "Alice", user_type: str = "student") -> bytes:
+        """Store a response for a query and return its key."""
+        key = cache.make_key(query, user_name, user_type)
+        cache.put(key, _response(text), user_name, user_type)
+        return key
+    
+    def test_key_normalizes_query_and_includes_user(self):
+        key = SmartRAGCache.make_key("  What   is RAG? ", "Alice", "student")
+        self.assertEqual(key, SmartRAGCache.make_key("what is rag?", "Alice", "student"))
+        self.assertNotEqual(key, SmartRAGCache.make_key("what is rag?", "Bob", "student"))
+        self.assertNotEqual(key, SmartRAGCache.make_key("what is rag?", "Alice", "staff"))
+    
+    def test_entry_expires_after_ttl(self):
+        cache = SmartRAGCache(ttl_seconds=10)
+        key = self._put(cache, "q")
+        
+        self.now += 9.9
+        self.assertEqual(cache.get(key), _response("answer"))
+        
+        self.now += 0.1
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SmartRAGCache(max_entries=2)
+        first = self._put(cache, "first")
+        second = self._put(cache, "second")
+        
+        # Using the first entry makes the second the least recently used
+        cache.get(first)
+        third = self._put(cache, "third")
+        
+        self.assertIsNotNone(cache.get(first))
+        self.assertIsNone(cache.get(second))
+        self.assertIsNotNone(cache.get(third))
+        self.assertEqual(cache.evictions, 1)
+    
+    def test_memory_cap_evicts_oldest_entries(self):
+        cache = SmartRAGCache(max_memory_bytes=10)
+        first = self._put(cache, "first", "x" * 4)
+        second = self._put(cache, "second", "x" * 4)
+        third = self._put(cache, "third", "x" * 4)
+        
+        self.assertIsNone(cache.get(first))
+        self.assertIsNotNone(cache.get(second))
+        self.assertIsNotNone(cache.get(third))
+        self.assertEqual(cache.stats()['memory_bytes'], 8)
+    
+    def test_response_larger_than_memory_cap_is_not_cached(self):
+        cache = SmartRAGCache(max_memory_bytes=10)
+        key = self._put(cache, "q", "x" * 11)
+        
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()['memory_bytes'], 0)
+    
+    def test_replacing_an_entry_updates_memory(self):
+        cache = SmartRAGCache()
+        key = self._put(cache, "q", "x" * 4)
+        self._put(cache, "q", "x" * 6)
+        
+        self.assertEqual(cache.get(key), _response("x" * 6))
+        self.assertEqual(cache.stats()['memory_bytes'], 6)
+    
+    def test_invalidate_by_user(self):
+        cache = SmartRAGCache()
+        alice_student = self._put(cache, "q", user_name="Alice", user_type="student")
+        alice_staff = self._put(cache, "q", user_name="Alice", user_type="staff")
+        bob_student = self._put(cache, "q", user_name="Bob", user_type="student")
+        
+        cache.invalidate(user_name="Alice", user_type="student")
+        self.assertIsNone(cache.get(alice_student))
+        self.assertIsNotNone(cache.get(alice_staff))
+        self.assertIsNotNone(cache.get(bob_student))
+        
+        cache.invalidate(user_type="student")
+        self.assertIsNone(cache.get(bob_student))
+        self.assertIsNotNone(cache.get(alice_staff))
+        
+        cache.invalidate(user_name="Alice")
+        self.assertIsNone(cache.get(alice_staff))
+        self.assertEqual(cache.stats()['memory_bytes'], 0)
+    
+    def test_invalidate_without_arguments_clears_cache(self):
+        cache = SmartRAGCache()
+        key = self._put(cache, "q")
+        
+        cache.invalidate()
+        
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual(cache.stats()['memory_bytes'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the TTS disk cache.
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from voice_assistant.tts_cache import TTSDiskCache
+
+class TTSDiskCacheTest(unittest.TestCase):
+    """Tests for TTSDiskCache."""
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name)
+    
+    def _write(self, name: str, size: int, mtime: float) -> Path:
+        """Create a file in the cache directory with the given size and modification time."""
+        path = self.cache_dir / name
+        path.write_bytes(b"x" * size)
+        os.utime(path, (mtime, mtime))
+        return path
+    
+    def test_put_then_get_path(self):
+        cache = TTSDiskCache(self.cache_dir, suffix=".wav")
+        cache.put("key", b"audio")
+        
+        path = cache.get_path("key")
+        self.assertEqual(path, self.cache_dir / "key.wav")
+        self.assertEqual(path.read_bytes(), b"audio")
+        self.assertIn("key", cache)
+        self.assertEqual(list(self.cache_dir.glob("*.tmp")), [])
+    
+    def test_get_path_misses(self):
+        cache = TTSDiskCache(self.cache_dir, suffix=".wav")
+        self.assertIsNone(cache.get_path("missing"))
+        
+        # A file deleted behind the cache's back is forgotten
+        cache.put("key", b"audio")
+        (self.cache_dir / "key.wav").unlink()
+        self.assertIsNone(cache.get_path("key"))
+        self.assertNotIn("key", cache)
+    
+    def test_put_evicts_least_recently_used(self):
+        cache = TTSDiskCache(self.cache_dir, max_bytes=10, suffix=".wav")
+        cache.put("a", b"x" * 4)
+        cache.put("b", b"x" * 4)
+        
+        # Reading "a" makes "b" the least recently used
+        cache.get_path("a")
+        cache.put("c", b"x" * 4)
+        
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertFalse((self.cache_dir / "b.wav").exists())
+    
+    def test_existing_files_are_evicted_by_mtime(self):
+        self._write("old.wav", 4, mtime=1000)
+        self._write("new.wav", 4, mtime=3000)
+        self._write("mid.wav", 4, mtime=2000)
+        
+        cache = TTSDiskCache(self.cache_dir, max_bytes=8, suffix=".wav")
+        
+        self.assertNotIn("old", cache)
+        self.assertIn("mid", cache)
+        self.assertIn("new", cache)
+        self.assertFalse((self.cache_dir / "old.wav").exists())
+    
+    def test_audio_larger_than_cap_is_not_cached(self):
+        cache = TTSDiskCache(self.cache_dir, max_bytes=4, suffix=".wav")
+        cache.put("key", b"x" * 5)
+        
+        self.assertNotIn("key", cache)
+        self.assertFalse((self.cache_dir / "key.wav").exists())
+    
+    def test_legacy_suffix_files_are_removed(self):
+        self._write("old.mp3", 4, mtime=1000)
+        self._write("kept.wav", 4, mtime=1000)
+        self._write("warm.lock", 0, mtime=1000)
+        
+        cache = TTSDiskCache(self.cache_dir, suffix=".wav", legacy_suffixes=(".mp3",))
+        
+        self.assertFalse((self.cache_dir / "old.mp3").exists())
+        self.assertTrue((self.cache_dir / "warm.lock").exists())
+        self.assertIn("kept", cache)
+
+if __name__ == '__main__':
+    unittest.main()
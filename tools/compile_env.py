@@ -0,0 +1,29 @@
+"""
+Compile Env Script
+
+This script bakes the project's .env file into env_baked.py so that
+config.py can import plain constants instead of parsing .env on every start.
+Run it as part of a build or deploy; config.py also refreshes the file
+automatically when .env changes.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config
+
+def main() -> int:
+    """
+    Main function to compile the .env file.
+    """
+    if not config.ENV_FILE.exists():
+        print(f"No .env file found at {config.ENV_FILE}")
+        return 1
+    
+    output = config.write_env_cache()
+    print(f"Wrote {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -2,8 +2,17 @@
 UI Package
 
 This package contains the user interface components for the voice assistant.
+
+MainWindow is imported on first access so that importing the package does not
+load tkinter until the UI is actually needed.
 """
+import importlib
 
-from ui.main_window import MainWindow
+__all__ = ['MainWindow']
 
-__all__ = ['MainWindow']
\ No newline at end of file
+def __getattr__(name):
+    if name == 'MainWindow':
+        value = importlib.import_module('ui.main_window').MainWindow
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -3,11 +3,13 @@ Main Window Module
 
 This module contains the main window UI for the voice assistant.
 """
+import asyncio
+import collections
+import concurrent.futures
 import logging
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import threading
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 
 import config
 from voice_assistant.assistant_manager import AssistantManager
@@ -28,14 +30,15 @@ class MainWindow:
         """
         self.assistant_manager = assistant_manager
         
-        # Set up callbacks
+        # Set up callbacks (they fire on worker threads, so run them on the Tk thread)
         self.assistant_manager.set_callbacks(
-            on_listening_start=self.on_listening_start,
-            on_listening_end=self.on_listening_end,
-            on_speaking_start=self.on_speaking_start,
-            on_speaking_end=self.on_speaking_end,
-            on_response=self.on_response,
-            on_user_info_change=self.on_user_info_change
+            on_listening_start=self._on_ui_thread(self.on_listening_start),
+            on_listening_end=self._on_ui_thread(self.on_listening_end),
+            on_speaking_start=self._on_ui_thread(self.on_speaking_start),
+            on_speaking_end=self._on_ui_thread(self.on_speaking_end),
+            on_response=self._on_ui_thread(self.on_response),
+            on_user_info_change=self._on_ui_thread(self.on_user_info_change),
+            on_partial_transcript=self._on_ui_thread(self.on_partial_transcript)
         )
         
         # Create the main window
@@ -93,6 +96,10 @@ class MainWindow:
         )
         self.conversation_text.pack(fill=tk.BOTH, expand=True)
         self.conversation_text.config(state=tk.DISABLED)
+        
+        # Messages waiting to be inserted by the next flush
+        self._pending = collections.deque()
+        self._flush_scheduled = False
     
     def create_input_area(self):
         """Create the text input area."""
@@ -186,6 +193,20 @@ class MainWindow:
         )
         update_button.pack(side=tk.RIGHT, padx=5, pady=5)
     
+    def _on_ui_thread(self, callback: Callable) -> Callable:
+        """
+        Wrap a callback so that it is scheduled on the Tk thread.
+        
+        Args:
+            callback: The UI callback to wrap.
+        
+        Returns:
+            A function that can safely be called from any thread.
+        """
+        def wrapper(*args):
+            self.root.after(0, callback, *args)
+        return wrapper
+    
     def run(self):
         """Run the main window loop."""
         self.root.mainloop()
@@ -203,14 +224,42 @@ class MainWindow:
         """
         Add a message to the conversation display.
         
+        Messages are queued and inserted together by the next flush, so bursts
+        of messages cost a single widget update.
+        
         Args:
             speaker: The speaker name.
             text: The message text.
         """
-        self.conversation_text.config(state=tk.NORMAL)
-        self.conversation_text.insert(tk.END, f"{speaker}: {text}\n\n")
+        self._pending.append(f"{speaker}: {text}\n\n")
+        
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after(16, self._flush_conversation)
+    
+    def _flush_conversation(self):
+        """Insert all pending messages into the conversation display."""
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        
+        text = "".join(self._pending)
+        self._pending.clear()
+        
+        # Suspend word wrapping during the insert so it is computed once afterwards
+        wrap = self.conversation_text.cget('wrap')
+        self.conversation_text.config(state=tk.NORMAL, wrap=tk.NONE)
+        self.conversation_text.insert(tk.END, text)
+        self._trim_conversation()
+        self.conversation_text.config(state=tk.DISABLED, wrap=wrap)
         self.conversation_text.see(tk.END)
-        self.conversation_text.config(state=tk.DISABLED)
+    
+    def _trim_conversation(self):
+        """Drop the oldest lines so the display keeps at most UI_MAX_CONVERSATION_LINES."""
+        line_count = int(self.conversation_text.index('end-1c').split('.')[0])
+        excess = line_count - config.UI_MAX_CONVERSATION_LINES
+        if excess > 0:
+            self.conversation_text.delete('1.0', f'{excess + 1}.0')
     
     def on_hotkey(self, event):
         """
@@ -240,12 +289,27 @@ class MainWindow:
             self.add_to_conversation("You", text)
             self.input_text.delete(0, tk.END)
             
-            # Process in a separate thread to avoid blocking the UI
-            threading.Thread(
-                target=self.assistant_manager.process_text_input,
-                args=(text,),
-                daemon=True
-            ).start()
+            # Process on the assistant's event loop to avoid blocking the UI
+            future = asyncio.run_coroutine_threadsafe(
+                self.assistant_manager.process_text_async(text),
+                self.assistant_manager.loop
+            )
+            future.add_done_callback(self._on_text_processed)
+    
+    def _on_text_processed(self, future: concurrent.futures.Future):
+        """
+        Report a failure to process text input. Called on the event loop thread.
+        
+        Args:
+            future: The future of the processing coroutine.
+        """
+        if future.cancelled():
+            return
+        
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Error processing text input: {error}", exc_info=error)
+            self.root.after(0, self.update_status, "Ready")
     
     def on_repeat_button(self):
         """Handle the repeat button click."""
@@ -253,6 +317,7 @@ class MainWindow:
     
     def on_clear_button(self):
         """Handle the clear button click."""
+        self._pending.clear()
         self.conversation_text.config(state=tk.NORMAL)
         self.conversation_text.delete(1.0, tk.END)
         self.conversation_text.config(state=tk.DISABLED)
@@ -284,6 +349,15 @@ class MainWindow:
         self.update_status("Processing...")
         self.listen_button.config(state=tk.NORMAL)
     
+    def on_partial_transcript(self, text: str):
+        """
+        Handle a partial transcript while the user is speaking.
+        
+        Args:
+            text: The transcript so far.
+        """
+        self.update_status(f"Listening... {text}")
+    
     def on_speaking_start(self):
         """Handle the speaking start event."""
         self.update_status("Speaking...")
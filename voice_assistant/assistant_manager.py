@@ -3,18 +3,51 @@ Assistant Manager Module
 
 This module coordinates all the voice assistant components.
 """
+import asyncio
+import collections
+import enum
 import logging
+import queue
 import threading
-from typing import Optional, Dict, Any, Callable
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, List
 
 import config
 from voice_assistant.speech_recognition import SpeechRecognizer
 from voice_assistant.text_to_speech import TextToSpeech
 from voice_assistant.nlp_processor import NLPProcessor
-from rag_client import RAGAPIClient
+from rag_client import RAGAPIClient, AsyncRAGAPIClient
 
 logger = logging.getLogger(__name__)
 
+# How long a voice query may run before the thinking filler is spoken
+THINKING_FILLER_DELAY = 0.5
+
+# Partial transcripts shorter than this are too unsettled to prefetch
+PREFETCH_MIN_WORDS = 4
+
+class AssistantState(enum.IntEnum):
+    """What the assistant is currently doing."""
+    IDLE = 0
+    LISTENING = 1
+    THINKING = 2
+    SPEAKING = 3
+
+@dataclass
+class ConversationTurn:
+    """
+    A single query/response exchange in the conversation history.
+    """
+    __slots__ = ('query', 'response', 'user_name', 'user_type', 'timestamp')
+    
+    query: str
+    response: Dict[str, Any]
+    user_name: str
+    user_type: str
+    timestamp: float
+
 class AssistantManager:
     """
     Class for managing the voice assistant components and coordinating their interactions.
@@ -22,20 +55,54 @@ class AssistantManager:
     
     def __init__(self):
         """Initialize the assistant manager and its components."""
-        # Initialize the RAG API client
+        # Initialize the RAG API clients
         self.rag_client = RAGAPIClient()
+        self.async_rag_client = AsyncRAGAPIClient()
+        
+        # Background event loop for async network I/O (text input)
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        
+        # Connect to the RAG API in the background so the first turn doesn't
+        # pay for DNS and the TLS handshake
+        threading.Thread(target=self.rag_client.warmup, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.async_rag_client.warmup(), self.loop)
+        
+        # Voice turns run one at a time on a single long-lived worker thread
+        self._turn_queue = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
+        
+        # Runs voice queries so a filler can be spoken while the RAG API works
+        self._query_executor = ThreadPoolExecutor(max_workers=1)
+        
+        # Speculative RAG query on the partial transcript while the user is
+        # still speaking; the client's response cache makes it reusable
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_rag: Optional[Future] = None
+        self._prefetched_query = None
+        self._last_partial = ""
         
         # Initialize the components
         self.speech_recognizer = SpeechRecognizer()
         self.text_to_speech = TextToSpeech()
-        self.nlp_processor = NLPProcessor(rag_client=self.rag_client)
+        self.nlp_processor = NLPProcessor(
+            rag_client=self.rag_client,
+            async_rag_client=self.async_rag_client
+        )
+        
+        # State variables; transitions are timestamped for latency tracking
+        self._state = AssistantState.IDLE
+        self._state_lock = threading.Lock()
+        self._state_ts: Dict[AssistantState, int] = {}
+        self._first_audio_ns = None
         
-        # State variables
-        self.is_listening = False
-        self.is_speaking = False
+        # Stops the barge-in monitor of the response being spoken
+        self._barge_in_stop = threading.Event()
         self.last_query = None
         self.last_response = None
-        self.conversation_history = []
+        self.conversation_history = collections.deque(maxlen=config.HISTORY_MAXLEN)
         
         # User information
         self.user_name = config.DEFAULT_USER_NAME
@@ -48,16 +115,78 @@ class AssistantManager:
         self.on_speaking_end_callback = None
         self.on_response_callback = None
         self.on_user_info_change_callback = None
+        self.on_partial_transcript_callback = None
         
         logger.info("Assistant manager initialized")
     
+    @property
+    def state(self) -> AssistantState:
+        """The current assistant state."""
+        return self._state
+    
+    @property
+    def is_listening(self) -> bool:
+        """Whether a voice turn is waiting for or capturing speech."""
+        return self._state == AssistantState.LISTENING
+    
+    @property
+    def is_speaking(self) -> bool:
+        """Whether a response is being spoken."""
+        return self._state == AssistantState.SPEAKING
+    
+    def _transition(self, to_state: AssistantState,
+                    from_state: Optional[AssistantState] = None) -> bool:
+        """
+        Atomically move to a new state and record when it happened.
+        
+        Args:
+            to_state: The state to move to.
+            from_state: Only transition if currently in this state (optional).
+        
+        Returns:
+            True if the transition happened.
+        """
+        with self._state_lock:
+            if from_state is not None and self._state != from_state:
+                return False
+            
+            self._state = to_state
+            self._state_ts[to_state] = time.monotonic_ns()
+            return True
+    
+    def get_last_latencies(self) -> Dict[str, float]:
+        """
+        Get the latencies of the most recent turn, in milliseconds.
+        
+        Returns:
+            A dictionary with 'response_ms' (query to response ready),
+            'first_audio_ms' (query to first audio) and 'finish_ms' (response
+            ready to end of speech). Stages the last turn didn't reach are left out.
+        """
+        with self._state_lock:
+            thinking = self._state_ts.get(AssistantState.THINKING)
+            speaking = self._state_ts.get(AssistantState.SPEAKING)
+            idle = self._state_ts.get(AssistantState.IDLE)
+            first_audio = self._first_audio_ns
+        
+        latencies = {}
+        if thinking is not None and speaking is not None and speaking >= thinking:
+            latencies['response_ms'] = (speaking - thinking) / 1e6
+            if first_audio is not None and first_audio >= speaking:
+                latencies['first_audio_ms'] = (first_audio - thinking) / 1e6
+            if idle is not None and idle >= speaking:
+                latencies['finish_ms'] = (idle - speaking) / 1e6
+        
+        return latencies
+    
     def set_callbacks(self,
                      on_listening_start: Optional[Callable] = None,
                      on_listening_end: Optional[Callable] = None,
                      on_speaking_start: Optional[Callable] = None,
                      on_speaking_end: Optional[Callable] = None,
                      on_response: Optional[Callable] = None,
-                     on_user_info_change: Optional[Callable] = None):
+                     on_user_info_change: Optional[Callable] = None,
+                     on_partial_transcript: Optional[Callable] = None):
         """
         Set callbacks for various events.
         
@@ -68,6 +197,7 @@ class AssistantManager:
             on_speaking_end: Called when the assistant stops speaking.
             on_response: Called when a response is ready, with the response data.
             on_user_info_change: Called when user information changes.
+            on_partial_transcript: Called with the transcript so far while the user is speaking.
         """
         self.on_listening_start_callback = on_listening_start
         self.on_listening_end_callback = on_listening_end
@@ -75,60 +205,151 @@ class AssistantManager:
         self.on_speaking_end_callback = on_speaking_end
         self.on_response_callback = on_response
         self.on_user_info_change_callback = on_user_info_change
+        self.on_partial_transcript_callback = on_partial_transcript
     
     def listen_and_respond(self):
         """
         Listen for user input, process it, and respond.
         This method runs asynchronously in a separate thread.
         """
-        if self.is_listening:
-            logger.warning("Already listening")
-            return
+        with self._state_lock:
+            if self._state == AssistantState.LISTENING:
+                logger.warning("Already listening")
+                return
+            
+            # Release the microphone if it is being watched for barge-in
+            self._barge_in_stop.set()
+            
+            self._state = AssistantState.LISTENING
+            self._state_ts[AssistantState.LISTENING] = time.monotonic_ns()
         
-        # Start in a separate thread to avoid blocking the UI
-        threading.Thread(target=self._listen_and_respond_thread, daemon=True).start()
+        # Hand the turn to the worker thread to avoid blocking the UI
+        self._turn_queue.put(self._listen_and_respond_thread)
+    
+    def _worker_loop(self):
+        """Thread function that runs queued turns until shutdown."""
+        while True:
+            turn = self._turn_queue.get()
+            if turn is None:
+                break
+            
+            try:
+                turn()
+            except Exception as e:
+                logger.exception(f"Error handling turn: {e}")
+                self._transition(AssistantState.IDLE)
     
     def _listen_and_respond_thread(self):
-        """Thread function for listen_and_respond."""
-        self.is_listening = True
+        """Turn function for listen_and_respond."""
+        self._last_partial = ""
         
         # Listen for speech
         query_text = self.speech_recognizer.recognize_from_microphone(
             on_listening_start=self._on_listening_start,
-            on_listening_end=self._on_listening_end
+            on_listening_end=self._on_listening_end,
+            on_partial_transcript=self._on_partial_transcript
         )
         
+        self._finish_prefetch(query_text)
+        
         if query_text:
             self.last_query = query_text
             
             # Process the query
-            response_data = self.nlp_processor.process_query(query_text)
-            self.last_response = response_data
-            
-            # Check if user information has changed
-            if self.user_name != self.nlp_processor.user_name or self.user_type != self.nlp_processor.user_type:
-                self.user_name = self.nlp_processor.user_name
-                self.user_type = self.nlp_processor.user_type
-                if self.on_user_info_change_callback:
-                    self.on_user_info_change_callback(self.user_name, self.user_type)
-            
-            # Add to conversation history
-            self.conversation_history.append({
-                'query': query_text,
-                'response': response_data,
-                'user_name': self.user_name,
-                'user_type': self.user_type
-            })
-            
-            # Notify about the response
-            if self.on_response_callback:
-                self.on_response_callback(response_data)
-            
-            # Speak the response
-            self._speak_response(response_data['response'])
+            future = self._query_executor.submit(self.nlp_processor.process_query, query_text)
+            if config.TTS_THINKING_FILLER:
+                try:
+                    response_data = future.result(timeout=THINKING_FILLER_DELAY)
+                except TimeoutError:
+                    self.text_to_speech.speak(config.TTS_THINKING_FILLER)
+                    response_data = future.result()
+            else:
+                response_data = future.result()
+            self._handle_response(query_text, response_data)
         else:
+            # Listening may already have ended (moving to THINKING) if audio
+            # was captured but couldn't be recognized
             logger.warning("No speech recognized")
-            self.is_listening = False
+            self._transition(AssistantState.IDLE)
+    
+    def _on_partial_transcript(self, text: str):
+        """
+        Called with the transcript so far while the user is speaking.
+        
+        Once the transcript is long enough and only growing (earlier words are
+        no longer being revised), the RAG query for it is started early.
+        
+        Args:
+            text: The transcript so far.
+        """
+        if self.on_partial_transcript_callback:
+            self.on_partial_transcript_callback(text)
+        
+        stable = text.startswith(self._last_partial)
+        self._last_partial = text
+        
+        # The prefetched answer reaches the final query through the response cache
+        if self.nlp_processor.response_cache.max_entries <= 0:
+            return
+        
+        if (not stable or text == self._prefetched_query or
+                len(text.split()) < PREFETCH_MIN_WORDS or
+                self.nlp_processor.is_command(text)):
+            return
+        
+        if self._pending_rag is not None:
+            self._pending_rag.cancel()
+        
+        logger.debug("Prefetching RAG response for partial transcript: %s", text)
+        self._prefetched_query = text
+        self._pending_rag = self._prefetch_executor.submit(
+            self._prefetch_rag,
+            text,
+            self.user_name,
+            self.user_type
+        )
+    
+    def _prefetch_rag(self, query_text: str, user_name: str, user_type: str):
+        """
+        Prefetch function that queries the RAG API and caches the response for the NLP processor.
+        
+        Args:
+            query_text: The partial transcript to query.
+            user_name: The user's name.
+            user_type: The user's type.
+        """
+        rag_response = self.rag_client.query(
+            query_text=query_text,
+            user_name=user_name,
+            user_type=user_type
+        )
+        self.nlp_processor.cache_rag_result(query_text, rag_response, user_name, user_type)
+    
+    def _finish_prefetch(self, query_text: Optional[str]):
+        """
+        Settle the speculative query once the final transcript is known.
+        
+        If it was for the final transcript, wait for it so the real query is
+        answered from the response cache it fills; otherwise cancel it if it
+        hasn't started.
+        
+        Args:
+            query_text: The final transcript, or None if nothing was recognized.
+        """
+        pending = self._pending_rag
+        if pending is None:
+            return
+        
+        if query_text == self._prefetched_query:
+            try:
+                pending.result()
+            except Exception:
+                pass  # The real query reports the error
+        else:
+            pending.cancel()
+        
+        self._pending_rag = None
+        self._prefetched_query = None
     
     def _speak_response(self, response_text: str):
         """
@@ -137,12 +358,14 @@ class AssistantManager:
         Args:
             response_text: The text to speak.
         """
-        self.is_speaking = True
+        self._first_audio_ns = None
+        self._transition(AssistantState.SPEAKING)
         
         self.text_to_speech.speak(
             response_text,
             on_start=self._on_speaking_start,
-            on_end=self._on_speaking_end
+            on_end=self._on_speaking_end,
+            on_audio_start=self._on_first_audio
         )
     
     def repeat_last_response(self):
@@ -163,9 +386,38 @@ class AssistantManager:
             return
         
         self.last_query = text
+        self._transition(AssistantState.THINKING)
         
         # Process the query
         response_data = self.nlp_processor.process_query(text)
+        self._handle_response(text, response_data)
+    
+    async def process_text_async(self, text: str):
+        """
+        Process text input directly using the async RAG API client.
+        Schedule it on ``self.loop`` with ``asyncio.run_coroutine_threadsafe``.
+        
+        Args:
+            text: The text input to process.
+        """
+        if not text:
+            return
+        
+        self.last_query = text
+        self._transition(AssistantState.THINKING)
+        
+        # Process the query
+        response_data = await self.nlp_processor.process_query_async(text)
+        self._handle_response(text, response_data)
+    
+    def _handle_response(self, query_text: str, response_data: Dict[str, Any]):
+        """
+        Record a processed query, notify listeners and speak the response.
+        
+        Args:
+            query_text: The query that was processed.
+            response_data: The response data from the NLP processor.
+        """
         self.last_response = response_data
         
         # Check if user information has changed
@@ -176,12 +428,13 @@ class AssistantManager:
                 self.on_user_info_change_callback(self.user_name, self.user_type)
         
         # Add to conversation history
-        self.conversation_history.append({
-            'query': text,
-            'response': response_data,
-            'user_name': self.user_name,
-            'user_type': self.user_type
-        })
+        self.conversation_history.append(ConversationTurn(
+            query=query_text,
+            response=response_data,
+            user_name=self.user_name,
+            user_type=self.user_type,
+            timestamp=time.time()
+        ))
         
         # Notify about the response
         if self.on_response_callback:
@@ -198,6 +451,7 @@ class AssistantManager:
             user_name: The user's name. If None, the name is not changed.
             user_type: The user's type. If None, the type is not changed.
         """
+        # Cached responses are keyed by user, so they stay valid for switching back
         if user_name:
             self.user_name = user_name
             self.nlp_processor.user_name = user_name
@@ -223,9 +477,9 @@ class AssistantManager:
     
     def stop_speaking(self):
         """Stop the current speech output."""
-        # This would depend on the TTS engine's capabilities
-        # For now, we'll just set the flag
-        self.is_speaking = False
+        self._barge_in_stop.set()
+        self.text_to_speech.stop()
+        self._transition(AssistantState.IDLE, from_state=AssistantState.SPEAKING)
     
     def _on_listening_start(self):
         """Called when listening starts."""
@@ -236,34 +490,92 @@ class AssistantManager:
     def _on_listening_end(self):
         """Called when listening ends."""
         logger.debug("Listening ended")
-        self.is_listening = False
+        self._transition(AssistantState.THINKING, from_state=AssistantState.LISTENING)
         if self.on_listening_end_callback:
             self.on_listening_end_callback()
     
     def _on_speaking_start(self):
         """Called when speaking starts."""
         logger.debug("Speaking started")
+        if config.BARGE_IN:
+            self._start_barge_in_monitor()
         if self.on_speaking_start_callback:
             self.on_speaking_start_callback()
     
+    def _on_first_audio(self):
+        """Called when the first audio of the response is played."""
+        self._first_audio_ns = time.monotonic_ns()
+    
     def _on_speaking_end(self):
         """Called when speaking ends."""
         logger.debug("Speaking ended")
-        self.is_speaking = False
+        self._barge_in_stop.set()
+        if (self._transition(AssistantState.IDLE, from_state=AssistantState.SPEAKING) and
+                logger.isEnabledFor(logging.DEBUG)):
+            logger.debug("Turn latencies: %s", self.get_last_latencies())
         if self.on_speaking_end_callback:
             self.on_speaking_end_callback()
     
-    def get_conversation_history(self):
+    def _start_barge_in_monitor(self):
+        """Watch the microphone while speaking, replacing any previous monitor."""
+        stop_event = threading.Event()
+        with self._state_lock:
+            # A turn that started listening meanwhile must not be given a new monitor
+            if self._state != AssistantState.SPEAKING:
+                return
+            
+            self._barge_in_stop.set()
+            self._barge_in_stop = stop_event
+        
+        threading.Thread(target=self._barge_in_monitor, args=(stop_event,), daemon=True).start()
+    
+    def _barge_in_monitor(self, stop_event: threading.Event):
+        """
+        Thread function that interrupts the response when the user starts talking.
+        
+        Args:
+            stop_event: Set when the response ends or listening starts another way.
+        """
+        if not self.speech_recognizer.wait_for_barge_in(stop_event):
+            return
+        
+        logger.info("User started speaking, interrupting the response")
+        self.text_to_speech.stop()
+        self._transition(AssistantState.IDLE, from_state=AssistantState.SPEAKING)
+        self.listen_and_respond()
+    
+    def get_conversation_history(self) -> List[ConversationTurn]:
         """
         Get the conversation history.
         
+        Only the most recent HISTORY_MAXLEN turns are kept.
+        
         Returns:
-            The conversation history as a list of query-response pairs.
+            The conversation history as a list of turns, oldest first.
         """
-        return self.conversation_history
+        return list(self.conversation_history)
     
     def clear_conversation_history(self):
         """Clear the conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
         self.last_query = None
-        self.last_response = None
\ No newline at end of file
+        self.last_response = None
+    
+    def shutdown(self):
+        """Close the API clients and microphone and stop the background threads."""
+        try:
+            asyncio.run_coroutine_threadsafe(self.async_rag_client.aclose(), self.loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error closing async RAG API client: {e}")
+        
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=5)
+        self._barge_in_stop.set()
+        self._turn_queue.put(None)
+        self._query_executor.shutdown(wait=False)
+        self._prefetch_executor.shutdown(wait=False)
+        self.rag_client.close()
+        self.speech_recognizer.close()
+        self.text_to_speech.close()
+        
+        logger.info("Assistant manager shut down")
\ No newline at end of file
@@ -5,38 +5,126 @@ This module handles natural language processing for the voice assistant.
 """
 import logging
 import re
-from typing import Dict, Any, Tuple, Optional, Match, List
+from typing import TYPE_CHECKING, Dict, Any, Tuple, Optional, Match, List
 
 import config
-from rag_client import RAGAPIClient
+from voice_assistant.rag_cache import SmartRAGCache
+
+if TYPE_CHECKING:
+    from rag_client import RAGAPIClient, AsyncRAGAPIClient, RAGResult
 
 logger = logging.getLogger(__name__)
 
+# Commands that are a fixed phrase (matched case-insensitively), by phrase
+LITERAL_COMMANDS = {
+    'help': 'help',
+    'what can you do': 'help',
+    'exit': 'exit',
+    'quit': 'exit',
+    'goodbye': 'exit',
+    'repeat': 'repeat',
+    'say that again': 'repeat',
+    'what is your name': 'get_assistant_name',
+    'who are you': 'get_assistant_name',
+}
+
+# Commands recognized by how the query starts, as (prefix, intent) pairs
+PREFIX_COMMANDS = (
+    ('what commands', 'help'),
+    ('what did you say', 'repeat'),
+)
+
+# Patterns for commands that take a value, by intent in priority order. Values
+# use named groups, which must be unique across all patterns.
+COMMAND_PATTERNS = {
+    'set_user_type': r'^i am a (?P<user_type>staff|student)$',
+    'set_user_name': r'^(?:set|call|change) my name to (?P<user_name>.+)$',
+}
+
+# Lowercased first characters of every command pattern above; queries starting
+# with anything else can't match them and skip the regex
+COMMAND_FIRST_CHARS = frozenset('cis')
+
+# Built once at import; lines are unindented so the text reads cleanly when
+# shown in the conversation view
+_HELP_TEXT = """
+Here are some things you can ask me:
+
+- Ask any question and I'll try to find the answer
+- "Set my name to [name]" to change your name
+- "I am a [staff/student]" to change your user type
+- "What's your name?" to learn about me
+- "Repeat" to repeat my last response
+- "Exit" or "Quit" to exit
+
+How can I help you today?
+""".strip()
+
 class NLPProcessor:
     """
     Class for handling natural language processing.
     """
     
-    def __init__(self, rag_client: RAGAPIClient):
+    # Fixed responses for commands that don't depend on the query; each hit
+    # gets a copy so callers can't modify the shared template
+    _STATIC_RESPONSES = {
+        'help': {
+            'is_command': True,
+            'success': True,
+            'response': _HELP_TEXT
+        },
+        'exit': {
+            'is_command': True,
+            'success': True,
+            'response': "Goodbye! Have a great day.",
+            'should_exit': True
+        },
+        'repeat': {
+            'is_command': True,
+            'success': True,
+            'response': "I'll repeat my last response.",
+            'should_repeat': True
+        },
+        'get_assistant_name': {
+            'is_command': True,
+            'success': True,
+            'response': "I'm your AI voice assistant. You can call me Assistant."
+        }
+    }
+    
+    # Entity patterns, longest first so dates and emails aren't split into numbers
+    _ENTITY_RE = re.compile(
+        r'\b(?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\b'
+        r'|\b(?P<date>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b'
+        r'|\b(?P<number>\d+)\b'
+    )
+    
+    def __init__(self, rag_client: 'RAGAPIClient',
+                 async_rag_client: Optional['AsyncRAGAPIClient'] = None):
         """
         Initialize the NLP processor.
         
         Args:
             rag_client: The RAG API client instance.
+            async_rag_client: The async RAG API client used by process_query_async (optional).
         """
         self.rag_client = rag_client
+        self.async_rag_client = async_rag_client
         self.user_name = config.DEFAULT_USER_NAME
         self.user_type = config.DEFAULT_USER_TYPE
         
-        # Define command patterns
-        self.command_patterns = {
-            'help': re.compile(r'^help$|^what can you do$|^what commands', re.IGNORECASE),
-            'exit': re.compile(r'^exit$|^quit$|^goodbye$', re.IGNORECASE),
-            'repeat': re.compile(r'^repeat$|^say that again$|^what did you say', re.IGNORECASE),
-            'set_user_type': re.compile(r'^i am a (staff|student)$', re.IGNORECASE),
-            'set_user_name': re.compile(r'^(set|call|change) my name to (.+)$', re.IGNORECASE),
-            'get_assistant_name': re.compile(r'^what is your name$|^who are you$', re.IGNORECASE),
-        }
+        # Cache of RAG responses for repeated queries
+        self.response_cache = SmartRAGCache(
+            max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=config.RESPONSE_CACHE_TTL
+        )
+        
+        # The parameterized command patterns are combined into one regex; the name of the
+        # matched outer group is the intent
+        self.command_pattern = re.compile(
+            '|'.join(f'(?P<{intent}>{pattern})' for intent, pattern in COMMAND_PATTERNS.items()),
+            re.IGNORECASE
+        )
         
         logger.info("NLP processor initialized")
     
@@ -51,21 +139,21 @@ class NLPProcessor:
             A dictionary containing the response and metadata.
         """
         if not query_text:
-            return {
-                'query': '',
-                'response': "I didn't catch that. Could you please repeat?",
-                'success': False,
-                'is_command': False
-            }
+            return self._empty_query_response()
         
         # Check if the query is a command
         intent, match = self._detect_command_intent(query_text)
         if intent:
             return self._handle_command(intent, match, query_text)
         
-        # If not a command, process as a regular query
+        # If not a command, answer from the cache when possible
+        cache_key, cached = self._get_cached_response(query_text)
+        if cached is not None:
+            return cached
+        
+        # Otherwise process as a regular query
         try:
-            logger.info(f"Processing query: {query_text}")
+            logger.info("Processing query: %s", query_text)
             
             # Get response from RAG API
             rag_response = self.rag_client.query(
@@ -74,27 +162,144 @@ class NLPProcessor:
                 user_type=self.user_type
             )
             
-            # Format the response
-            response = {
-                'query': query_text,
-                'response': rag_response['answer'],
-                'confidence': rag_response.get('confidence', 0.0),
-                'sources': rag_response.get('sources', []),
-                'success': True,
-                'is_command': False,
-                'raw_response': rag_response
-            }
+            response = self._format_rag_response(query_text, rag_response)
+            self.response_cache.put(cache_key, response, self.user_name, self.user_type)
+            return response
+        except Exception as e:
+            logger.exception(f"Error processing query: {e}")
+            return self._error_response(query_text, e)
+    
+    async def process_query_async(self, query_text: str) -> Dict[str, Any]:
+        """
+        Process a user query using the async RAG API client.
+        
+        Args:
+            query_text: The user's query text.
+        
+        Returns:
+            A dictionary containing the response and metadata.
+        """
+        if not query_text:
+            return self._empty_query_response()
+        
+        # Check if the query is a command
+        intent, match = self._detect_command_intent(query_text)
+        if intent:
+            return self._handle_command(intent, match, query_text)
+        
+        # If not a command, answer from the cache when possible
+        cache_key, cached = self._get_cached_response(query_text)
+        if cached is not None:
+            return cached
+        
+        # Otherwise process as a regular query
+        try:
+            logger.info("Processing query: %s", query_text)
             
+            # Get response from RAG API
+            rag_response = await self.async_rag_client.query(
+                query_text=query_text,
+                user_name=self.user_name,
+                user_type=self.user_type
+            )
+            
+            response = self._format_rag_response(query_text, rag_response)
+            self.response_cache.put(cache_key, response, self.user_name, self.user_type)
             return response
         except Exception as e:
             logger.exception(f"Error processing query: {e}")
-            return {
-                'query': query_text,
-                'response': "I'm sorry, I encountered an error while processing your request.",
-                'success': False,
-                'is_command': False,
-                'error': str(e)
-            }
+            return self._error_response(query_text, e)
+    
+    def _get_cached_response(self, query_text: str) -> Tuple[bytes, Optional[Dict[str, Any]]]:
+        """
+        Look up a cached response for the query and the current user.
+        
+        Args:
+            query_text: The user's query text.
+        
+        Returns:
+            A tuple of (cache key, response), where the response is None on a miss.
+        """
+        cache_key = self.response_cache.make_key(query_text, self.user_name, self.user_type)
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        
+        logger.info("Answering query from cache: %s", query_text)
+        return cache_key, {**cached, 'query': query_text, 'cached': True}
+    
+    def cache_rag_result(self, query_text: str, rag_response: 'RAGResult', user_name: str, user_type: str):
+        """
+        Store a RAG API response fetched outside process_query, so the query is answered from the cache.
+        
+        Args:
+            query_text: The query the response is for.
+            rag_response: The response returned by the RAG API client.
+            user_name: The user the response was fetched for.
+            user_type: The user type the response was fetched for.
+        """
+        cache_key = self.response_cache.make_key(query_text, user_name, user_type)
+        self.response_cache.put(cache_key, self._format_rag_response(query_text, rag_response), user_name, user_type)
+    
+    def _empty_query_response(self) -> Dict[str, Any]:
+        """Build the response returned for an empty query."""
+        return {
+            'query': '',
+            'response': "I didn't catch that. Could you please repeat?",
+            'success': False,
+            'is_command': False
+        }
+    
+    def _format_rag_response(self, query_text: str, rag_response: 'RAGResult') -> Dict[str, Any]:
+        """
+        Format a RAG API response.
+        
+        Args:
+            query_text: The user's query text.
+            rag_response: The response returned by the RAG API client.
+        
+        Returns:
+            A dictionary containing the response and metadata.
+        """
+        return {
+            'query': query_text,
+            'response': rag_response.answer,
+            'confidence': rag_response.confidence,
+            'sources': rag_response.sources,
+            'success': True,
+            'is_command': False
+        }
+    
+    def _error_response(self, query_text: str, error: Exception) -> Dict[str, Any]:
+        """
+        Build the response returned when a query fails.
+        
+        Args:
+            query_text: The user's query text.
+            error: The exception raised while processing the query.
+        
+        Returns:
+            A dictionary containing the response and metadata.
+        """
+        return {
+            'query': query_text,
+            'response': "I'm sorry, I encountered an error while processing your request.",
+            'success': False,
+            'is_command': False,
+            'error': str(error)
+        }
+    
+    def is_command(self, query_text: str) -> bool:
+        """
+        Check whether a query is a command rather than a question for the RAG API.
+        
+        Args:
+            query_text: The user's query text.
+        
+        Returns:
+            True if the query is a command.
+        """
+        return self._detect_command_intent(query_text)[0] is not None
     
     def _detect_command_intent(self, query_text: str) -> Tuple[Optional[str], Optional[Match]]:
         """
@@ -104,28 +309,46 @@ class NLPProcessor:
             query_text: The user's query text.
         
         Returns:
-            A tuple of (intent, match) if a command is detected, or (None, None) otherwise.
+            A tuple of (intent, match) if a command is detected, or (None, None)
+            otherwise. The match is None for commands without parameters.
         """
-        for intent, pattern in self.command_patterns.items():
-            match = pattern.match(query_text)
-            if match:
-                logger.debug(f"Detected command intent: {intent}")
-                return intent, match
+        normalized = query_text.lower()
+        intent = LITERAL_COMMANDS.get(normalized)
+        if intent is None:
+            intent = next((intent for prefix, intent in PREFIX_COMMANDS if normalized.startswith(prefix)), None)
+        if intent is not None:
+            logger.debug("Detected command intent: %s", intent)
+            return intent, None
+        
+        if normalized[:1] not in COMMAND_FIRST_CHARS:
+            return None, None
+        
+        match = self.command_pattern.match(query_text)
+        if match:
+            logger.debug("Detected command intent: %s", match.lastgroup)
+            return match.lastgroup, match
         
         return None, None
     
-    def _handle_command(self, intent: str, match: Match, query_text: str) -> Dict[str, Any]:
+    def _handle_command(self, intent: str, match: Optional[Match], query_text: str) -> Dict[str, Any]:
         """
         Handle a command based on the detected intent.
         
         Args:
             intent: The detected command intent.
-            match: The regex match object.
+            match: The regex match object (None for commands without parameters).
             query_text: The original query text.
         
         Returns:
             A dictionary containing the response and metadata.
         """
+        static_response = self._STATIC_RESPONSES.get(intent)
+        if static_response is not None:
+            response = static_response.copy()
+            response['query'] = query_text
+            response['intent'] = intent
+            return response
+        
         response = {
             'query': query_text,
             'is_command': True,
@@ -133,58 +356,24 @@ class NLPProcessor:
             'success': True
         }
         
-        if intent == 'help':
-            response['response'] = self._get_help_text()
-        
-        elif intent == 'exit':
-            response['response'] = "Goodbye! Have a great day."
-            response['should_exit'] = True
-        
-        elif intent == 'repeat':
-            response['response'] = "I'll repeat my last response."
-            response['should_repeat'] = True
-        
-        elif intent == 'set_user_type':
-            user_type = match.group(1).lower()
+        if intent == 'set_user_type':
+            user_type = match.group('user_type').lower()
             self.user_type = user_type
             response['response'] = f"I've updated your user type to {user_type}."
             response['user_type_changed'] = True
         
         elif intent == 'set_user_name':
-            user_name = match.group(2).strip()
+            user_name = match.group('user_name').strip()
             self.user_name = user_name
             response['response'] = f"I'll call you {user_name} from now on."
             response['user_name_changed'] = True
         
-        elif intent == 'get_assistant_name':
-            response['response'] = "I'm your AI voice assistant. You can call me Assistant."
-        
         else:
             response['response'] = "I'm not sure how to handle that command."
             response['success'] = False
         
         return response
     
-    def _get_help_text(self) -> str:
-        """
-        Get the help text for available commands.
-        
-        Returns:
-            The help text.
-        """
-        return """
-        Here are some things you can ask me:
-        
-        - Ask any question and I'll try to find the answer
-        - "Set my name to [name]" to change your name
-        - "I am a [staff/student]" to change your user type
-        - "What's your name?" to learn about me
-        - "Repeat" to repeat my last response
-        - "Exit" or "Quit" to exit
-        
-        How can I help you today?
-        """.strip()
-    
     def extract_entities(self, text: str) -> Dict[str, Any]:
         """
         Extract entities from text.
@@ -196,24 +385,16 @@ class NLPProcessor:
             A dictionary of extracted entities.
         """
         # This is a simple implementation that could be expanded with NER models
-        entities = {}
-        
-        # Extract dates
-        date_pattern = re.compile(r'\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b')
-        date_matches = date_pattern.findall(text)
-        if date_matches:
-            entities['dates'] = date_matches
-        
-        # Extract emails
-        email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        email_matches = email_pattern.findall(text)
-        if email_matches:
-            entities['emails'] = email_matches
-        
-        # Extract numbers
-        number_pattern = re.compile(r'\b\d+\b')
-        number_matches = number_pattern.findall(text)
-        if number_matches:
-            entities['numbers'] = [int(num) for num in number_matches]
+        entities = {'dates': [], 'emails': [], 'numbers': []}
+        
+        # One scan picks up all entity types; the matched group names the type
+        for match in self._ENTITY_RE.finditer(text):
+            entities[match.lastgroup + 's'].append(match.group())
+        
+        # Convert all numbers in one pass after the scan
+        entities['numbers'] = list(map(int, entities['numbers']))
+        
+        # Only report entity types that were found
+        entities = {kind: values for kind, values in entities.items() if values}
         
         return entities
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+RAG Cache Module
+
+This module provides an in-memory cache for RAG responses, so repeated
+questions can be answered without another round trip to the RAG API.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+class CacheEntry(NamedTuple):
+    """A cached response and its bookkeeping data."""
+    value: Dict[str, Any]
+    expires_at: float
+    size: int
+    user_name: str
+    user_type: str
+
+class SmartRAGCache:
+    """
+    Thread-safe LRU cache with TTL expiry for RAG responses.
+    
+    Entries are keyed by a hash of the normalized query and the user it was
+    asked for, and evicted when they expire, when the cache is full, or when
+    the total size of the cached answers exceeds the memory cap.
+    """
+    
+    def __init__(self,
+                 max_entries: int = 512,
+                 ttl_seconds: float = 600,
+                 max_memory_bytes: int = 4 * 1024 * 1024):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached responses.
+            ttl_seconds: How long a response stays valid, in seconds.
+            max_memory_bytes: Approximate cap on the total size of cached answers.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        
+        self._entries: 'OrderedDict[bytes, CacheEntry]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._memory_bytes = 0
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(query_text: str, user_name: str, user_type: str) -> bytes:
+        """
+        Build the cache key for a query.
+        
+        Args:
+            query_text: The user's query text.
+            user_name: The user's name.
+            user_type: The user's type.
+        
+        Returns:
+            The cache key.
+        """
+        normalized = WHITESPACE_PATTERN.sub(' ', query_text.strip().lower())
+        return hashlib.blake2b(f"{user_type}|{user_name}|{normalized}".encode(), digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: The cache key from make_key.
+        
+        Returns:
+            The cached response, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+    
+    def put(self, key: bytes, value: Dict[str, Any], user_name: str, user_type: str):
+        """
+        Store a response.
+        
+        Args:
+            key: The cache key from make_key.
+            value: The response to cache.
+            user_name: The user the response was generated for.
+            user_type: The user type the response was generated for.
+        """
+        size = len(value.get('response', ''))
+        if size > self.max_memory_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            
+            self._entries[key] = CacheEntry(
+                value=value,
+                expires_at=time.monotonic() + self.ttl_seconds,
+                size=size,
+                user_name=user_name,
+                user_type=user_type
+            )
+            self._memory_bytes += size
+            
+            # Evict least recently used entries until within limits
+            while len(self._entries) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def invalidate(self, user_name: Optional[str] = None, user_type: Optional[str] = None):
+        """
+        Drop cached responses. With no arguments, the whole cache is cleared.
+        
+        Args:
+            user_name: Only drop entries for this user name (optional).
+            user_type: Only drop entries for this user type (optional).
+        """
+        with self._lock:
+            if user_name is None and user_type is None:
+                self._entries.clear()
+                self._memory_bytes = 0
+                logger.debug("Response cache cleared")
+                return
+            
+            stale_keys = [
+                key for key, entry in self._entries.items()
+                if (user_name is None or entry.user_name == user_name) and
+                   (user_type is None or entry.user_type == user_type)
+            ]
+            for key in stale_keys:
+                self._remove(key)
+            
+            logger.debug("Dropped %d cached responses for %s (%s)", len(stale_keys), user_name, user_type)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            A dictionary with hit/miss/eviction counts, size and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'memory_bytes': self._memory_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+    
+    def _remove(self, key: bytes):
+        """Remove an entry; the caller must hold the lock."""
+        entry = self._entries.pop(key)
+        self._memory_bytes -= entry.size
\ No newline at end of file
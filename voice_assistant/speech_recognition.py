@@ -3,19 +3,51 @@ Speech Recognition Module
 
 This module handles speech-to-text conversion using various speech recognition engines.
 """
+import collections
+import contextlib
 import logging
 import threading
-from typing import Optional, Callable
+import time
+from typing import Optional, Callable, Iterator
 
 import speech_recognition as sr
 import webrtcvad
 import sounddevice as sd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 import config
+from voice_assistant.streaming_stt import SAMPLE_RATE, StreamingSTT, VoskStreamingSTT
 
 logger = logging.getLogger(__name__)
 
+# Frames whose mean squared amplitude (16-bit PCM) is below this are treated as
+# silence without asking the VAD; roughly an RMS of 100, well below speech level
+VAD_ENERGY_THRESHOLD = 100 ** 2
+
+# Fraction of frames that must contain speech for audio to count as speech
+SPEECH_FRAME_RATIO = 0.3
+
+# Frame length for VAD endpointing and speech activity detection
+VAD_FRAME_MS = 30
+
+# Distance between the starts of consecutive frames in detect_speech_activity;
+# equal to VAD_FRAME_MS for no overlap, or e.g. 15 for 50% overlap
+VAD_FRAME_STEP_MS = 30
+
+# Consecutive voiced frames that start an utterance, so clicks don't trigger capture
+SPEECH_START_FRAMES = 3
+
+# Trailing silence that ends an utterance
+ENDPOINT_SILENCE_MS = 250
+
+# Minimum mean squared amplitude for barge-in frames; well above the assistant's
+# own voice leaking from the speakers at normal volume (an RMS of about 1000)
+BARGE_IN_ENERGY_THRESHOLD = 1000 ** 2
+
+# Frames kept from before speech starts so the first syllable isn't clipped
+PRE_ROLL_FRAMES = 10
+
 class SpeechRecognizer:
     """
     Class for handling speech recognition functionality.
@@ -27,24 +59,65 @@ class SpeechRecognizer:
         self.vad = webrtcvad.Vad(3)  # Aggressiveness level 3 (highest)
         self.is_listening = False
         
-        # Configure the recognizer
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.energy_threshold = 4000
-        self.recognizer.pause_threshold = 0.8
-        self.recognizer.phrase_threshold = 0.3
-        self.recognizer.non_speaking_duration = 0.5
+        # The microphone stream is opened on first use and kept open between
+        # turns; it is only started while someone is reading from it
+        self._stream: Optional[sd.RawInputStream] = None
+        self._mic_lock = threading.Lock()
+        
+        # Reused int16 buffer for detect_speech_activity, sized for the longest phrase
+        self._int16_scratch = np.empty(config.SPEECH_RECOGNITION_PHRASE_TIME_LIMIT * SAMPLE_RATE, dtype=np.int16)
+        self._scratch_lock = threading.Lock()
+        
+        # The local streaming model is loaded on first use
+        self._local_stt: Optional[StreamingSTT] = None
         
         logger.info("Speech recognizer initialized")
     
+    @contextlib.contextmanager
+    def _mic_frames(self) -> Iterator[Callable[[], bytes]]:
+        """
+        Start the microphone stream, opening it on first use, and stop it afterwards.
+        The caller must hold ``self._mic_lock``.
+        
+        Stopping rather than closing keeps the device open between turns, and
+        discards audio captured while nobody was reading.
+        
+        Yields:
+            A function that reads the next 30 ms frame of 16-bit PCM.
+        """
+        frame_size = SAMPLE_RATE * VAD_FRAME_MS // 1000
+        if self._stream is None:
+            self._stream = sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=frame_size,
+                                             dtype='int16', channels=1)
+        
+        self._stream.start()
+        try:
+            yield lambda: bytes(self._stream.read(frame_size)[0])
+        finally:
+            self._stream.stop()
+    
+    def close(self):
+        """Close the microphone if it is open."""
+        with self._mic_lock:
+            if self._stream is not None:
+                try:
+                    self._stream.close()
+                except Exception as e:
+                    logger.warning(f"Error closing microphone: {e}")
+                self._stream = None
+    
     def recognize_from_microphone(self,
                                 on_listening_start: Optional[Callable] = None,
-                                on_listening_end: Optional[Callable] = None) -> Optional[str]:
+                                on_listening_end: Optional[Callable] = None,
+                                on_partial_transcript: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
         Listen for speech input from the microphone and convert it to text.
         
         Args:
             on_listening_start: Callback for when listening starts.
             on_listening_end: Callback for when listening ends.
+            on_partial_transcript: Called with the transcript so far while the user
+                is speaking (local recognition only).
         
         Returns:
             The recognized text, or None if no speech was detected.
@@ -53,53 +126,187 @@ class SpeechRecognizer:
             logger.warning("Already listening")
             return None
         
+        if config.USE_LOCAL_STT:
+            return self._recognize_local(on_listening_start, on_listening_end, on_partial_transcript)
+        
         self.is_listening = True
         
         try:
-            # Use the default microphone as the audio source
-            with sr.Microphone() as source:
-                logger.debug("Adjusting for ambient noise")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                
+            with self._mic_lock:
                 if on_listening_start:
                     on_listening_start()
                 
                 logger.debug("Listening for speech")
-                try:
-                    # Listen for speech with timeout
-                    audio = self.recognizer.listen(
-                        source,
-                        timeout=config.SPEECH_RECOGNITION_TIMEOUT,
-                        phrase_time_limit=config.SPEECH_RECOGNITION_PHRASE_TIME_LIMIT
-                    )
-                except sr.WaitTimeoutError:
+                audio = self._listen_with_vad()
+                if audio is None:
                     logger.warning("No speech detected within timeout")
                     return None
+            
+            if on_listening_end:
+                on_listening_end()
+            
+            logger.debug("Converting speech to text")
+            try:
+                # Convert speech to text
+                text = self.recognizer.recognize_google(
+                    audio,
+                    language=config.SPEECH_RECOGNITION_LANGUAGE
+                )
+                logger.info("Recognized text: %s", text)
+                return text
+            except sr.UnknownValueError:
+                logger.warning("Speech was not understood")
+                return None
+            except sr.RequestError as e:
+                logger.error(f"Could not request results: {e}")
+                return None
+        except Exception as e:
+            logger.exception(f"Error in speech recognition: {e}")
+            return None
+        finally:
+            self.is_listening = False
+    
+    def _recognize_local(self,
+                         on_listening_start: Optional[Callable] = None,
+                         on_listening_end: Optional[Callable] = None,
+                         on_partial_transcript: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Recognize one utterance with the local streaming model.
+        
+        Args:
+            on_listening_start: Callback for when listening starts.
+            on_listening_end: Callback for when listening ends.
+            on_partial_transcript: Called with the transcript so far while the user is speaking.
+        
+        Returns:
+            The recognized text, or None if no speech was detected.
+        """
+        self.is_listening = True
+        
+        try:
+            with self._mic_lock:
+                if self._local_stt is None:
+                    self._local_stt = VoskStreamingSTT()
+                self._local_stt.start()
                 
-                if on_listening_end:
-                    on_listening_end()
+                if on_listening_start:
+                    on_listening_start()
                 
-                logger.debug("Converting speech to text")
-                try:
-                    # Convert speech to text
-                    text = self.recognizer.recognize_google(
-                        audio,
-                        language=config.SPEECH_RECOGNITION_LANGUAGE
-                    )
-                    logger.info(f"Recognized text: {text}")
-                    return text
-                except sr.UnknownValueError:
-                    logger.warning("Speech was not understood")
-                    return None
-                except sr.RequestError as e:
-                    logger.error(f"Could not request results: {e}")
-                    return None
+                logger.debug("Listening for speech")
+                heard_speech = False
+                for frame in self._utterance_frames():
+                    heard_speech = True
+                    partial = self._local_stt.feed(frame)
+                    if partial and on_partial_transcript:
+                        on_partial_transcript(partial)
+                
+                text = self._local_stt.finalize()
+            
+            if not heard_speech:
+                logger.warning("No speech detected within timeout")
+                return None
+            
+            if on_listening_end:
+                on_listening_end()
+            
+            if not text:
+                logger.warning("Speech was not understood")
+                return None
+            
+            logger.info("Recognized text: %s", text)
+            return text
         except Exception as e:
-            logger.exception(f"Error in speech recognition: {e}")
+            logger.exception(f"Error in local speech recognition: {e}")
             return None
         finally:
             self.is_listening = False
     
+    def _listen_with_vad(self) -> Optional[sr.AudioData]:
+        """
+        Capture one utterance, ending it as soon as the VAD hears trailing silence.
+        The caller must hold ``self._mic_lock``.
+        
+        Returns:
+            The captured audio, or None if no speech started within the timeout.
+        """
+        frames = list(self._utterance_frames())
+        if not frames:
+            return None
+        
+        return sr.AudioData(b''.join(frames), SAMPLE_RATE, 2)
+    
+    def _utterance_frames(self) -> Iterator[bytes]:
+        """
+        Capture one utterance from the microphone as 30 ms frames of 16-bit PCM.
+        
+        Frames are yielded as they arrive, starting just before the VAD hears
+        SPEECH_START_FRAMES voiced frames in a row and ending after
+        ENDPOINT_SILENCE_MS of silence, so the
+        caller can process speech while it is still being spoken. Nothing is
+        yielded if no speech starts within the listening timeout.
+        The caller must hold ``self._mic_lock``.
+        
+        Yields:
+            Raw audio frames.
+        """
+        endpoint_frames = ENDPOINT_SILENCE_MS // VAD_FRAME_MS
+        
+        with self._mic_frames() as read_frame:
+            # Wait for speech, keeping a little audio from before it starts
+            pre_roll = collections.deque(maxlen=PRE_ROLL_FRAMES)
+            deadline = time.monotonic() + config.SPEECH_RECOGNITION_TIMEOUT
+            voiced_frames = 0
+            while voiced_frames < SPEECH_START_FRAMES:
+                if time.monotonic() > deadline:
+                    return
+                
+                frame = read_frame()
+                pre_roll.append(frame)
+                voiced_frames = voiced_frames + 1 if self.vad.is_speech(frame, SAMPLE_RATE) else 0
+            
+            yield from pre_roll
+            
+            # Stream the utterance until enough trailing silence
+            silent_frames = 0
+            deadline = time.monotonic() + config.SPEECH_RECOGNITION_PHRASE_TIME_LIMIT
+            while silent_frames < endpoint_frames and time.monotonic() < deadline:
+                frame = read_frame()
+                yield frame
+                silent_frames = 0 if self.vad.is_speech(frame, SAMPLE_RATE) else silent_frames + 1
+    
+    def wait_for_barge_in(self, stop_event: threading.Event) -> bool:
+        """
+        Watch the microphone for the user talking over the assistant.
+        
+        Speech onset is SPEECH_START_FRAMES consecutive frames that are both
+        loud enough to pass BARGE_IN_ENERGY_THRESHOLD and voiced according to
+        the VAD. The energy gate keeps the assistant's own voice from
+        triggering it.
+        
+        Args:
+            stop_event: Set to stop watching.
+        
+        Returns:
+            True if the user started speaking, False if stopped first.
+        """
+        try:
+            with self._mic_lock, self._mic_frames() as read_frame:
+                voiced_frames = 0
+                while not stop_event.is_set():
+                    frame = read_frame()
+                    samples = np.frombuffer(frame, dtype=np.int16).astype(np.int32)
+                    if (np.mean(samples * samples) > BARGE_IN_ENERGY_THRESHOLD and
+                            self.vad.is_speech(frame, SAMPLE_RATE)):
+                        voiced_frames += 1
+                        if voiced_frames >= SPEECH_START_FRAMES:
+                            return True
+                    else:
+                        voiced_frames = 0
+        except Exception as e:
+            logger.exception(f"Error in barge-in detection: {e}")
+        
+        return False
+    
     def detect_speech_activity(self, audio_data: np.ndarray, sample_rate: int = 16000) -> bool:
         """
         Detect if there is speech activity in the audio data.
@@ -112,23 +319,43 @@ class SpeechRecognizer:
             True if speech activity is detected, False otherwise.
         """
         try:
-            # Convert float audio data to 16-bit PCM
-            audio_data = (audio_data * 32768).astype(np.int16)
-            
-            # Process in 30ms frames
-            frame_duration = 30  # ms
-            frame_size = int(sample_rate * frame_duration / 1000)
-            num_frames = len(audio_data) // frame_size
+            # Split into 30ms frames, VAD_FRAME_STEP_MS apart
+            frame_size = sample_rate * VAD_FRAME_MS // 1000
+            frame_step = sample_rate * VAD_FRAME_STEP_MS // 1000
+            if len(audio_data) < frame_size:
+                return False
             
-            # Check each frame for voice activity
-            speech_frames = 0
-            for i in range(num_frames):
-                frame = audio_data[i * frame_size:(i + 1) * frame_size]
-                if self.vad.is_speech(frame.tobytes(), sample_rate):
-                    speech_frames += 1
-            
-            # Consider it speech if more than 30% of frames contain speech
-            return speech_frames / num_frames > 0.3
+            num_frames = (len(audio_data) - frame_size) // frame_step + 1
+            num_samples = (num_frames - 1) * frame_step + frame_size
+            with self._scratch_lock:
+                if len(self._int16_scratch) < num_samples:
+                    self._int16_scratch = np.empty(num_samples, dtype=np.int16)
+                
+                # Convert float audio data to 16-bit PCM in place in the scratch
+                # buffer, without a full-size float64 temporary
+                pcm = self._int16_scratch[:num_samples]
+                np.multiply(audio_data[:num_samples], 32767, out=pcm, casting='unsafe')
+                # Frames are strided views of the buffer, so nothing is copied
+                frames = sliding_window_view(pcm, frame_size)[::frame_step]
+                
+                # Only frames loud enough to possibly be speech go through the VAD
+                energies = np.mean(frames.astype(np.int32) ** 2, axis=1)
+                candidates = np.flatnonzero(energies > VAD_ENERGY_THRESHOLD)
+                
+                # Consider it speech if more than 30% of frames contain speech
+                required_frames = int(num_frames * SPEECH_FRAME_RATIO) + 1
+                remaining = len(candidates)
+                speech_frames = 0
+                for index in candidates:
+                    if speech_frames + remaining < required_frames:
+                        return False
+                    remaining -= 1
+                    if self.vad.is_speech(frames[index].tobytes(), sample_rate):
+                        speech_frames += 1
+                        if speech_frames >= required_frames:
+                            return True
+                
+                return False
         except Exception as e:
             logger.exception(f"Error in speech activity detection: {e}")
             return False
@@ -161,30 +388,30 @@ class SpeechRecognizer:
             callback: Function to call with recognized text.
         """
         try:
-            with sr.Microphone() as source:
-                logger.debug("Starting continuous listening")
-                
-                while True:
+            logger.debug("Starting continuous listening")
+            
+            while True:
+                try:
+                    # Hold the microphone only while capturing each phrase
+                    with self._mic_lock:
+                        audio = self._listen_with_vad()
+                    if audio is None:
+                        continue
+                    
                     try:
-                        audio = self.recognizer.listen(
-                            source,
-                            phrase_time_limit=config.SPEECH_RECOGNITION_PHRASE_TIME_LIMIT
+                        text = self.recognizer.recognize_google(
+                            audio,
+                            language=config.SPEECH_RECOGNITION_LANGUAGE
                         )
-                        
-                        try:
-                            text = self.recognizer.recognize_google(
-                                audio,
-                                language=config.SPEECH_RECOGNITION_LANGUAGE
-                            )
-                            if text:
-                                callback(text)
-                        except sr.UnknownValueError:
-                            pass  # Ignore unrecognized speech
-                        except sr.RequestError as e:
-                            logger.error(f"Could not request results: {e}")
-                    except Exception as e:
-                        logger.exception(f"Error in continuous listening: {e}")
-                        break
+                        if text:
+                            callback(text)
+                    except sr.UnknownValueError:
+                        pass  # Ignore unrecognized speech
+                    except sr.RequestError as e:
+                        logger.error(f"Could not request results: {e}")
+                except Exception as e:
+                    logger.exception(f"Error in continuous listening: {e}")
+                    break
         except Exception as e:
             logger.exception(f"Error setting up continuous listening: {e}")
     
@@ -0,0 +1,136 @@
+"""
+Streaming Speech-to-Text Module
+
+This module provides on-device speech recognition that consumes audio frame by
+frame and reports partial transcripts while the user is still speaking.
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import orjson
+
+try:
+    from vosk import KaldiRecognizer, Model, SetLogLevel
+except ImportError:  # Optional: only needed when USE_LOCAL_STT is enabled
+    KaldiRecognizer = Model = SetLogLevel = None
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Audio format expected by the streaming recognizers: 16 kHz mono 16-bit PCM
+SAMPLE_RATE = 16000
+
+class StreamingSTT(ABC):
+    """
+    Interface for streaming speech-to-text engines.
+    
+    An utterance is recognized by calling start(), then feed() for each audio
+    frame as it is captured, then finalize() once the speaker has stopped.
+    """
+    
+    @abstractmethod
+    def start(self):
+        """Begin a new utterance, discarding any previous state."""
+    
+    @abstractmethod
+    def feed(self, frame: bytes) -> Optional[str]:
+        """
+        Feed one frame of 16 kHz mono 16-bit PCM audio.
+        
+        Args:
+            frame: The raw audio frame.
+        
+        Returns:
+            The transcript so far if it changed, otherwise None.
+        """
+    
+    @abstractmethod
+    def finalize(self) -> str:
+        """
+        Finish the utterance.
+        
+        Returns:
+            The full transcript (empty if nothing was recognized).
+        """
+
+class VoskStreamingSTT(StreamingSTT):
+    """
+    Streaming speech-to-text using a local Vosk (Kaldi) model.
+    """
+    
+    def __init__(self, model_path: Optional[str] = None):
+        """
+        Load the Vosk model.
+        
+        Args:
+            model_path: Path to the Vosk model directory. If None, uses the value from config.
+        
+        Raises:
+            RuntimeError: If the vosk package is not installed.
+        """
+        if Model is None:
+            raise RuntimeError("Local speech recognition requires the vosk package")
+        
+        SetLogLevel(-1)
+        self.model_path = model_path or config.VOSK_MODEL_PATH
+        self._model = Model(self.model_path)
+        self._recognizer = None
+        self._segments = []
+        self._partial = ""
+        
+        logger.info(f"Vosk speech recognizer loaded model: {self.model_path}")
+    
+    def start(self):
+        """Begin a new utterance, discarding any previous state."""
+        self._recognizer = KaldiRecognizer(self._model, SAMPLE_RATE)
+        self._segments = []
+        self._partial = ""
+    
+    def feed(self, frame: bytes) -> Optional[str]:
+        """
+        Feed one frame of 16 kHz mono 16-bit PCM audio.
+        
+        Args:
+            frame: The raw audio frame.
+        
+        Returns:
+            The transcript so far if it changed, otherwise None.
+        """
+        changed = False
+        if self._recognizer.AcceptWaveform(frame):
+            # Vosk finished a segment at an internal pause
+            text = orjson.loads(self._recognizer.Result()).get('text', '')
+            if text:
+                self._segments.append(text)
+                changed = True
+            partial = ""
+        else:
+            partial = orjson.loads(self._recognizer.PartialResult()).get('partial', '')
+        
+        if partial != self._partial:
+            self._partial = partial
+            changed = True
+        
+        if not changed:
+            return None
+        
+        return " ".join(self._segments + [partial] if partial else self._segments)
+    
+    def finalize(self) -> str:
+        """
+        Finish the utterance.
+        
+        Returns:
+            The full transcript (empty if nothing was recognized).
+        """
+        text = orjson.loads(self._recognizer.FinalResult()).get('text', '')
+        if text:
+            self._segments.append(text)
+        
+        transcript = " ".join(self._segments)
+        self._recognizer = None
+        self._segments = []
+        self._partial = ""
+        return transcript
@@ -3,20 +3,137 @@ Text-to-Speech Module
 
 This module handles text-to-speech conversion using various TTS engines.
 """
+import base64
+import functools
+import hashlib
+import io
 import logging
 import os
-import tempfile
+import queue
+import re
 import threading
-from typing import Optional, Callable
+import time
+import unicodedata
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Callable, Iterable, Iterator, List, Tuple, Union
 
+import numpy as np
 import pyttsx3
+import requests
+import sounddevice as sd
+import soundfile as sf
 from gtts import gTTS
-from playsound import playsound
+from gtts.tts import gTTSError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import config
+from voice_assistant.tts_cache import TTSDiskCache
 
 logger = logging.getLogger(__name__)
 
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\s*\n\s*')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+GTTS_AUDIO_MARKER = 'jQ1olc'
+GTTS_AUDIO_PATTERN = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+# Sentences synthesized ahead of the one playing
+SYNTH_READ_AHEAD = 2
+
+# Audio is written to the output stream in blocks of this length, so stop() takes effect quickly
+PLAYBACK_BLOCK_SECONDS = 0.1
+
+# A warm-up lock file older than this is left over from a crashed instance
+WARM_LOCK_STALE_SECONDS = 600
+
+# After a failed gTTS request, uncached sentences are spoken with pyttsx3 for this long
+GTTS_FAILURE_BACKOFF_SECONDS = 30
+
+# Decoded sentences kept in memory, so short repeated prompts skip disk and decoding
+PCM_CACHE_ENTRIES = 16
+
+@functools.lru_cache(maxsize=8)
+def _resolve_voice(language: str, voice_id: Optional[str] = None) -> Optional[str]:
+    """
+    Find the pyttsx3 voice to use, enumerating the system voices only once per language.
+    
+    Args:
+        language: The language code to match against voice IDs.
+        voice_id: An explicit voice ID, returned as is.
+    
+    Returns:
+        The voice ID, or None to keep the engine's default voice.
+    """
+    if voice_id:
+        return voice_id
+    
+    # pyttsx3.init() returns the shared engine for the default driver
+    for voice in pyttsx3.init().getProperty('voices'):
+        if language in voice.id:
+            return voice.id
+    
+    return None
+
+class PooledGTTS(gTTS):
+    """
+    gTTS variant that sends its requests over a shared requests.Session.
+    
+    gTTS opens a new session, and so a new TLS connection, for every part of
+    every sentence; this reuses pooled connections instead.
+    """
+    
+    def __init__(self, *args, session: requests.Session, **kwargs):
+        """
+        Initialize the request.
+        
+        Args:
+            *args: Positional arguments for gTTS.
+            session: The session to send requests with.
+            **kwargs: Keyword arguments for gTTS.
+        """
+        super().__init__(*args, **kwargs)
+        self.session = session
+    
+    def stream(self) -> Iterator[bytes]:
+        """
+        Fetch the speech one text part at a time.
+        
+        Yields:
+            The MP3 audio of each part.
+        
+        Raises:
+            gTTSError: If a request fails or its response carries no audio.
+        """
+        for prepared_request in self._prepare_requests():
+            try:
+                response = self.session.send(
+                    prepared_request,
+                    timeout=self.timeout,
+                    proxies=urllib.request.getproxies()
+                )
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                raise gTTSError(tts=self, response=getattr(e, 'response', None)) from e
+            
+            found_audio = False
+            for line in response.iter_lines(chunk_size=1024):
+                decoded_line = line.decode("utf-8")
+                if GTTS_AUDIO_MARKER not in decoded_line:
+                    continue
+                
+                audio_search = GTTS_AUDIO_PATTERN.search(decoded_line)
+                if not audio_search:
+                    # Successful response, but no audio in it
+                    raise gTTSError(tts=self, response=response)
+                found_audio = True
+                yield base64.b64decode(audio_search.group(1).encode("ascii"))
+            
+            if not found_audio:
+                raise gTTSError(tts=self, response=response)
+
 class TextToSpeech:
     """
     Class for handling text-to-speech functionality.
@@ -27,6 +144,7 @@ class TextToSpeech:
         self.engine_type = config.TTS_ENGINE.lower()
         self.language = config.TTS_LANGUAGE
         self.voice_id = config.TTS_VOICE_ID
+        self.engine = None
         
         # Initialize the appropriate engine
         if self.engine_type == "pyttsx3":
@@ -38,11 +156,47 @@ class TextToSpeech:
             self.engine_type = "pyttsx3"
             self._init_pyttsx3()
         
-        self.is_speaking = False
-        self.temp_files = []
+        # Synthesized gTTS audio is kept on disk so repeated sentences skip the
+        # network; it is stored as 16-bit PCM WAV so cache hits need no MP3 decoding
+        self.audio_cache = None
+        if config.TTS_CACHE_ENABLED:
+            self.audio_cache = TTSDiskCache(
+                config.ensure_dir(config.CACHE_DIR / "tts"),
+                max_bytes=config.TTS_CACHE_MAX_BYTES,
+                suffix=".wav",
+                legacy_suffixes=(".mp3",)  # Entries cached before the switch to PCM
+            )
+        
+        # Only the synthesis thread uses this, so it needs no lock
+        self._pcm_cache: 'OrderedDict[str, Tuple[np.ndarray, int]]' = OrderedDict()
+        
+        # Pre-synthesize common phrases in the background so they play from cache
+        if self.engine_type == "gtts" and self.audio_cache is not None and config.TTS_WARM_PHRASES:
+            threading.Thread(target=self._warm_cache, args=(config.TTS_WARM_PHRASES,), daemon=True).start()
+        
+        # Requests are spoken in order by a single worker thread; for gTTS
+        # later sentences are synthesized while earlier ones play
+        self._queue = queue.Queue()
+        self._cancel_evt = threading.Event()
+        self._speaking_evt = threading.Event()
+        self._on_audio_start = None  # Only used by the worker thread
+        self._synth_executor = ThreadPoolExecutor(max_workers=1)
+        
+        # stop() bumps the generation under the lock; requests queued under an
+        # older generation are dropped even if the worker already dequeued them
+        self._state_lock = threading.Lock()
+        self._generation = 0
+        
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
         
         logger.info(f"Text-to-speech initialized with engine: {self.engine_type}")
     
+    @property
+    def is_speaking(self) -> bool:
+        """Whether a request is being spoken."""
+        return self._speaking_evt.is_set()
+    
     def _init_pyttsx3(self):
         """Initialize the pyttsx3 engine."""
         try:
@@ -52,71 +206,159 @@ class TextToSpeech:
             self.engine.setProperty('rate', 150)  # Speed
             self.engine.setProperty('volume', 1.0)  # Volume (0.0 to 1.0)
             
-            # Set voice if specified
-            if self.voice_id:
-                self.engine.setProperty('voice', self.voice_id)
-            else:
-                # Try to find a voice for the specified language
-                voices = self.engine.getProperty('voices')
-                for voice in voices:
-                    if self.language in voice.id:
-                        self.engine.setProperty('voice', voice.id)
-                        break
+            # Use the specified voice, or try to find one for the language
+            voice_id = _resolve_voice(self.language, self.voice_id)
+            if voice_id:
+                self.engine.setProperty('voice', voice_id)
+            
+            self.engine.connect('started-utterance', lambda name: self._audio_started())
             
             logger.debug("pyttsx3 engine initialized")
         except Exception as e:
             logger.exception(f"Error initializing pyttsx3: {e}")
             raise
     
-    def _init_gtts(self):
-        """Initialize the gTTS engine (nothing to initialize)."""
-        # gTTS doesn't need initialization, but we'll check if we can create a temp file
+    @functools.cached_property
+    def _fallback_engine(self) -> Optional['pyttsx3.Engine']:
+        """pyttsx3 engine that stands in while the TTS service is unreachable, initialized on first use."""
         try:
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=True) as f:
-                logger.debug("gTTS engine initialized (temp file test passed)")
-        except Exception as e:
-            logger.exception(f"Error testing gTTS temp file: {e}")
-            raise
+            self._init_pyttsx3()
+        except Exception:
+            logger.warning("pyttsx3 is unavailable; gTTS failures will not fall back to it")
+        return self.engine
+    
+    def _init_gtts(self):
+        """Initialize the gTTS engine (check that its MP3 output can be decoded)."""
+        # gTTS needs no setup, but its audio is decoded in memory with
+        # libsndfile, which only reads MP3 from version 1.1.0
+        if 'MP3' not in sf.available_formats():
+            raise RuntimeError(f"libsndfile {sf.__libsndfile_version__} cannot decode MP3; gTTS needs 1.1.0 or later")
+        
+        # Reuse connections to the TTS service across sentences (HTTP keep-alive)
+        retries = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(["POST"])
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+        self._gtts_retry_at = 0.0
+        self._gtts_session = requests.Session()
+        self._gtts_session.mount("https://", adapter)
+        
+        logger.debug("gTTS engine initialized")
     
     def speak(self, text: str, 
              on_start: Optional[Callable] = None,
-             on_end: Optional[Callable] = None):
+             on_end: Optional[Callable] = None,
+             on_audio_start: Optional[Callable] = None):
         """
         Convert text to speech and play it.
         
+        Requests made while speaking are queued and played in order.
+        
         Args:
             text: The text to convert to speech.
             on_start: Callback for when speech starts.
             on_end: Callback for when speech ends.
+            on_audio_start: Callback for when the first audio of the text is played.
         """
         if not text:
             logger.warning("Empty text provided to speak")
             return
         
-        if self.is_speaking:
-            logger.warning("Already speaking, ignoring new request")
-            return
+        with self._state_lock:
+            self._queue.put((self._generation, text, on_start, on_end, on_audio_start))
+    
+    def _worker_loop(self):
+        """Thread function that speaks queued requests one at a time."""
+        carry = None
+        while True:
+            request = carry or self._queue.get()
+            carry = None
+            if request is None:
+                self._queue.task_done()
+                break
+            
+            # gTTS requests that are already waiting are played as one, so the
+            # next one is synthesized while the previous one plays
+            batch = [request]
+            if self.engine_type == "gtts":
+                pending, carry = self._take_pending()
+                batch.extend(pending)
+            
+            try:
+                with self._state_lock:
+                    live = [r for r in batch if r[0] == self._generation]  # Others were dropped by stop()
+                    if not live:
+                        continue
+                    self._speaking_evt.set()
+                    self._cancel_evt.clear()
+                
+                if len(live) == 1:
+                    _, text, on_start, on_end, on_audio_start = live[0]
+                else:
+                    # One sentence per line, so each request keeps its own sentence boundaries
+                    text = "\n".join(r[1] for r in live)
+                    on_start = _chain([r[2] for r in live])
+                    on_end = _chain([r[3] for r in live])
+                    on_audio_start = live[0][4]
+                
+                self._on_audio_start = on_audio_start
+                self._speak_thread(text, on_start, on_end)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _take_pending(self) -> Tuple[List[tuple], Optional[tuple]]:
+        """
+        Take the requests that are already queued, without waiting.
+        
+        A request with an on_audio_start callback is not batched behind
+        others, since its audio would start before the callback could tell.
+        
+        Returns:
+            The queued requests that can join the batch, oldest first, and the
+            request that ended the batch (to be spoken next), if any. A
+            shutdown sentinel is left in the queue.
+        """
+        pending = []
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if request is None:
+                self._queue.task_done()
+                self._queue.put(None)
+                break
+            if request[4] is not None:
+                return pending, request
+            pending.append(request)
         
-        # Start in a separate thread to avoid blocking
-        threading.Thread(
-            target=self._speak_thread,
-            args=(text, on_start, on_end),
-            daemon=True
-        ).start()
+        return pending, None
+    
+    def _audio_started(self):
+        """Run the on_audio_start callback of the request being spoken, once."""
+        callback, self._on_audio_start = self._on_audio_start, None
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                logger.exception(f"Error in audio start callback: {e}")
     
     def _speak_thread(self, text: str, 
                      on_start: Optional[Callable] = None,
                      on_end: Optional[Callable] = None):
         """
-        Thread function for speak.
+        Speak a single request. Called by the worker thread.
         
         Args:
             text: The text to convert to speech.
             on_start: Callback for when speech starts.
             on_end: Callback for when speech ends.
         """
-        self.is_speaking = True
-        
         try:
             if on_start:
                 on_start()
@@ -128,13 +370,10 @@ class TextToSpeech:
         except Exception as e:
             logger.exception(f"Error in text-to-speech: {e}")
         finally:
-            self.is_speaking = False
+            self._speaking_evt.clear()
             
             if on_end:
                 on_end()
-            
-            # Clean up any temporary files
-            self._cleanup_temp_files()
     
     def _speak_pyttsx3(self, text: str):
         """
@@ -151,46 +390,337 @@ class TextToSpeech:
     
     def _speak_gtts(self, text: str):
         """
-        Speak using gTTS.
+        Speak using gTTS, streaming the audio sentence by sentence.
+        
+        Sentences are synthesized and decoded to PCM on the synthesis thread
+        and written to one output stream as they arrive, so playback starts as
+        soon as the first sentence is ready and the next sentences are
+        synthesized while earlier ones play. If the TTS service fails, the
+        rest of the text is spoken with pyttsx3.
         
         Args:
             text: The text to speak.
         """
+        # Synthesis runs at most SYNTH_READ_AHEAD sentences ahead of playback
+        chunks = queue.Queue(maxsize=SYNTH_READ_AHEAD)
+        self._synth_executor.submit(self._synthesize_stream, text, chunks)
+        
+        # Low latency so playback starts, and aborts, as soon as possible
+        latency = config.TTS_PLAYBACK_LATENCY_MS / 1000 if config.TTS_PLAYBACK_LATENCY_MS > 0 else 'low'
+        
+        chunk = chunks.get()
         try:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as f:
-                temp_filename = f.name
-                self.temp_files.append(temp_filename)
-            
-            # Generate speech
-            tts = gTTS(text=text, lang=self.language, slow=False)
-            tts.save(temp_filename)
-            
-            # Play the speech
-            playsound(temp_filename)
+            if isinstance(chunk, tuple):
+                samples, sample_rate = chunk
+                block_size = int(sample_rate * PLAYBACK_BLOCK_SECONDS)
+                with sd.OutputStream(samplerate=sample_rate, channels=samples.shape[1],
+                                     dtype='float32', latency=latency) as stream:
+                    while isinstance(chunk, tuple):
+                        samples = chunk[0]
+                        for start in range(0, len(samples), block_size):
+                            if self._cancel_evt.is_set():
+                                stream.abort()
+                                return
+                            stream.write(samples[start:start + block_size])
+                            self._audio_started()
+                        chunk = chunks.get()
         except Exception as e:
             logger.exception(f"Error in gTTS speech: {e}")
+        finally:
+            if isinstance(chunk, tuple):
+                # Playback ended early: stop the synthesis thread and unblock
+                # it if it is waiting on the full queue
+                self._cancel_evt.set()
+                while chunks.get() is not None:
+                    pass
+            elif isinstance(chunk, str):
+                chunks.get()  # The closing None
+        
+        if isinstance(chunk, str) and not self._cancel_evt.is_set():
+            # gTTS failed: speak the rest with pyttsx3
+            if self._fallback_engine is not None:
+                self._speak_pyttsx3(chunk)
     
-    def _cleanup_temp_files(self):
-        """Clean up temporary files."""
-        for filename in self.temp_files:
+    def _synthesize_stream(self, text: str, chunks: queue.Queue):
+        """
+        Synthesize text with gTTS one sentence at a time.
+        
+        Args:
+            text: The text to synthesize.
+            chunks: Receives (samples, sample_rate) tuples as audio becomes
+                available, with float32 samples shaped (frames, channels),
+                then None when done. If gTTS fails, the text that was not
+                synthesized is sent as a string before the None.
+        """
+        sentences = split_sentences(text)
+        try:
+            for i, sentence in enumerate(sentences):
+                try:
+                    for chunk in self._sentence_chunks(sentence):
+                        if self._cancel_evt.is_set():
+                            return
+                        chunks.put(chunk)
+                except gTTSError as e:
+                    if time.monotonic() >= self._gtts_retry_at:
+                        logger.warning(f"gTTS request failed, using pyttsx3 for {GTTS_FAILURE_BACKOFF_SECONDS}s: {e}")
+                        self._gtts_retry_at = time.monotonic() + GTTS_FAILURE_BACKOFF_SECONDS
+                    chunks.put("\n".join(sentences[i:]))
+                    return
+        except Exception as e:
+            logger.exception(f"Error in gTTS synthesis: {e}")
+        finally:
+            chunks.put(None)
+    
+    def _sentence_chunks(self, text: str) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Get a sentence as PCM audio, from the caches when possible.
+        
+        On a cache miss, gTTS fetches long sentences in several parts; each
+        part is yielded as soon as it arrives, and the whole sentence is cached
+        once complete.
+        
+        Args:
+            text: The sentence to synthesize.
+        
+        Yields:
+            (samples, sample_rate) tuples, with read-only float32 samples
+            shaped (frames, channels).
+        """
+        cache_key = self._cache_key(text)
+        cached = self._pcm_cache.get(cache_key)
+        if cached is not None:
+            self._pcm_cache.move_to_end(cache_key)
+            yield cached
+            return
+        
+        # Cached files are read in place rather than copied into memory first
+        path = self.audio_cache.get_path(cache_key) if self.audio_cache is not None else None
+        if path is not None:
             try:
-                if os.path.exists(filename):
-                    os.remove(filename)
-            except Exception as e:
-                logger.warning(f"Error removing temp file {filename}: {e}")
+                decoded = _decode_audio(path)
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"Error reading cached speech {cache_key}: {e}")
+            else:
+                self._remember_pcm(cache_key, decoded)
+                yield decoded
+                return
+        
+        if time.monotonic() < self._gtts_retry_at:
+            raise gTTSError("gTTS is unavailable after a recent failure")
+        
+        parts = []
+        for part in self._gtts(text).stream():
+            samples, sample_rate = _decode_audio(part)
+            parts.append(samples)
+            yield samples, sample_rate
+        
+        if not parts:
+            return
+        
+        samples = np.concatenate(parts)
+        samples.flags.writeable = False
+        if self.audio_cache is not None:
+            self.audio_cache.put(cache_key, _encode_wav(samples, sample_rate))
+        self._remember_pcm(cache_key, (samples, sample_rate))
+    
+    def _remember_pcm(self, cache_key: str, decoded: Tuple[np.ndarray, int]):
+        """
+        Add decoded audio to the in-memory cache, evicting the oldest entry if full.
+        
+        Args:
+            cache_key: The cache key of the sentence.
+            decoded: The (samples, sample_rate) tuple.
+        """
+        self._pcm_cache[cache_key] = decoded
+        if len(self._pcm_cache) > PCM_CACHE_ENTRIES:
+            self._pcm_cache.popitem(last=False)
+    
+    def _warm_cache(self, phrases: Iterable[str]):
+        """
+        Synthesize phrases that aren't in the disk cache yet.
+        
+        A lock file in the cache directory keeps several instances from
+        warming the same cache at once.
+        
+        Args:
+            phrases: The phrases to cache.
+        """
+        lock_path = self.audio_cache.cache_dir / "warm.lock"
+        try:
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime < WARM_LOCK_STALE_SECONDS:
+                    logger.debug("TTS cache is being warmed by another instance")
+                    return
+                lock_fd = os.open(lock_path, os.O_WRONLY)
+                os.utime(lock_path)
+            except OSError as e:
+                logger.warning(f"Error taking TTS cache warm-up lock: {e}")
+                return
+        
+        try:
+            warmed = 0
+            for phrase in phrases:
+                for sentence in split_sentences(phrase):
+                    cache_key = self._cache_key(sentence)
+                    if cache_key in self.audio_cache:
+                        continue
+                    
+                    mp3 = io.BytesIO()
+                    self._gtts(sentence).write_to_fp(mp3)
+                    self.audio_cache.put(cache_key, _encode_wav(*_decode_audio(mp3.getvalue())))
+                    warmed += 1
+            
+            logger.debug("TTS cache warm-up synthesized %d sentences", warmed)
+        except Exception as e:
+            logger.warning(f"Error warming TTS cache: {e}")
+        finally:
+            os.close(lock_fd)
+            try:
+                lock_path.unlink()
+            except OSError:
+                pass
+    
+    def _gtts(self, text: str) -> 'PooledGTTS':
+        """
+        Create a gTTS request for text with the configured language.
+        
+        Args:
+            text: The text to synthesize.
+        
+        Returns:
+            The gTTS object, sending its requests over the shared session.
+        """
+        return PooledGTTS(text=text, lang=self.language, slow=False, session=self._gtts_session)
+    
+    def _cache_key(self, text: str) -> str:
+        """
+        Get the cache key for a piece of text with the current voice settings.
         
-        self.temp_files = []
+        Texts that only differ in ways that don't change the speech share a key;
+        the original text is still what gets synthesized.
+        
+        Args:
+            text: The text to be spoken.
+        
+        Returns:
+            The cache key.
+        """
+        key = f"{self.engine_type}|{self.language}|{self.voice_id}|{normalize_for_cache(text)}"
+        return hashlib.sha256(key.encode()).hexdigest()
     
     def stop(self):
-        """Stop the current speech."""
-        if not self.is_speaking:
-            return
+        """Stop the current speech right away and drop any queued requests."""
+        with self._state_lock:
+            self._generation += 1
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._queue.task_done()
+            
+            if not self._speaking_evt.is_set():
+                return
+            
+            self._cancel_evt.set()
         
-        if self.engine_type == "pyttsx3":
+        if self.engine is not None:
             try:
                 self.engine.stop()
             except Exception as e:
                 logger.exception(f"Error stopping pyttsx3 speech: {e}")
+    
+    def close(self, timeout: float = 5):
+        """
+        Stop speaking and shut down the worker threads.
         
-        self.is_speaking = False
\ No newline at end of file
+        Args:
+            timeout: How long to wait for the worker thread to exit, in seconds.
+        """
+        self.stop()
+        self._queue.put(None)
+        self._worker.join(timeout=timeout)
+        self._synth_executor.shutdown(wait=False)
+
+def _chain(callbacks: List[Optional[Callable]]) -> Optional[Callable]:
+    """
+    Combine callbacks into one that calls each in order.
+    
+    Args:
+        callbacks: The callbacks; None entries are skipped.
+    
+    Returns:
+        The combined callback, or None if there are none.
+    """
+    callbacks = [callback for callback in callbacks if callback]
+    if not callbacks:
+        return None
+    
+    def call_all():
+        for callback in callbacks:
+            callback()
+    
+    return call_all
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences on terminal punctuation and line breaks.
+    
+    Args:
+        text: The text to split.
+    
+    Returns:
+        A list of non-empty sentences (at least one element).
+    """
+    sentences = [sentence for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+    return sentences or [text]
+
+def normalize_for_cache(text: str) -> str:
+    """
+    Normalize text for cache lookups.
+    
+    Applies Unicode NFKC normalization, collapses whitespace, lowercases and
+    drops trailing full stops, which gTTS speaks the same either way.
+    Question and exclamation marks are kept since they change the intonation.
+    
+    Args:
+        text: The text to normalize.
+    
+    Returns:
+        The normalized text.
+    """
+    text = WHITESPACE_PATTERN.sub(' ', unicodedata.normalize('NFKC', text)).strip().lower()
+    return text.rstrip('. ')
+
+def _decode_audio(data: Union[bytes, Path]) -> Tuple[np.ndarray, int]:
+    """
+    Decode MP3 or WAV audio to PCM.
+    
+    Args:
+        data: The audio, or the path of an audio file.
+    
+    Returns:
+        A (samples, sample_rate) tuple, with read-only float32 samples shaped
+        (frames, channels).
+    """
+    source = data if isinstance(data, Path) else io.BytesIO(data)
+    samples, sample_rate = sf.read(source, dtype='float32', always_2d=True)
+    samples.flags.writeable = False
+    return samples, sample_rate
+
+def _encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encode PCM audio as a 16-bit WAV file.
+    
+    Args:
+        samples: Float32 samples shaped (frames, channels).
+        sample_rate: The sample rate in Hz.
+    
+    Returns:
+        The WAV file contents.
+    """
+    wav = io.BytesIO()
+    sf.write(wav, samples, sample_rate, format='WAV', subtype='PCM_16')
+    return wav.getvalue()
@@ -0,0 +1,156 @@
+"""
+TTS Cache Module
+
+This module provides a size-bounded disk cache for synthesized speech, so
+repeated sentences don't need another round trip to the TTS service.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+class TTSDiskCache:
+    """
+    Thread-safe LRU cache of audio files, bounded by total size on disk.
+    
+    Recency is kept in the files' modification times (touched on every hit),
+    so the LRU order survives restarts without a separate metadata file.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = 100 * 1024 * 1024, suffix: str = ".mp3",
+                 legacy_suffixes: Iterable[str] = ()):
+        """
+        Initialize the cache, indexing any files already in the directory.
+        
+        Args:
+            cache_dir: Directory holding the cached files (must exist).
+            max_bytes: Cap on the total size of the cached files.
+            suffix: File name suffix of the cached files.
+            legacy_suffixes: Suffixes of files left by earlier cache formats,
+                which are deleted since they would never be read or evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        
+        for legacy_suffix in legacy_suffixes:
+            for path in cache_dir.glob(f"*{legacy_suffix}"):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Error removing old cached speech {path.name}: {e}")
+        
+        # Index existing files, least recently used first
+        files = []
+        for path in cache_dir.glob(f"*{suffix}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        
+        with self._lock:
+            self._evict()
+        
+        logger.debug("TTS cache holds %d files (%d bytes)", len(self._entries), self._total_bytes)
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+    
+    def get_path(self, key: str) -> Optional[Path]:
+        """
+        Look up cached audio without reading it, so it can be decoded straight from the file.
+        
+        The file may still be evicted before it is opened, so readers must
+        handle it going missing.
+        
+        Args:
+            key: The cache key (used as the file name).
+        
+        Returns:
+            The path of the cached file, or None if it isn't cached.
+        """
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        
+        try:
+            os.utime(path)
+            return path
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+    
+    def put(self, key: str, audio: bytes):
+        """
+        Store audio, evicting the least recently used files if over the size cap.
+        
+        The file is written under a temporary name and renamed into place, so
+        a concurrent reader never sees a partial file.
+        
+        Args:
+            key: The cache key (used as the file name).
+            audio: The audio data.
+        """
+        if len(audio) > self.max_bytes:
+            return
+        
+        path = self._path(key)
+        # Unique per process and thread, so concurrent writers never share a temporary file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Error caching synthesized speech: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(audio)
+            self._total_bytes += len(audio)
+            self._evict()
+    
+    def _path(self, key: str) -> Path:
+        """Get the file that holds a cache entry."""
+        return self.cache_dir / f"{key}{self.suffix}"
+    
+    def _forget(self, key: str):
+        """Drop an entry from the index; the caller must hold the lock."""
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+    
+    def _evict(self):
+        """Delete least recently used files until within the size cap; the caller must hold the lock."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass  # Already removed, e.g. by hand or by another instance
+            except OSError as e:
+                logger.warning(f"Error removing cached speech {key}: {e}")
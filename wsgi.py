@@ -0,0 +1,16 @@
+"""
+WSGI Entry Point
+
+This module exposes the mock RAG server for production WSGI servers. The
+simulated latency uses time.sleep, so run it with gevent workers, which patch
+sleep to yield and keep many requests in flight per worker:
+
+    gunicorn -k gevent -w 1 --worker-connections 200 -b 0.0.0.0:5000 wsgi:app
+
+Threaded workers also work, with concurrency capped by the thread count:
+
+    gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app
+"""
+from mock_rag_server import app
+
+__all__ = ['app']
\ No newline at end of file